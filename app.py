@@ -1,47 +1,108 @@
 import streamlit as st
 from datetime import datetime
 import asyncio
+import atexit
 import os
-import json
 import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import itertools
+import mmap
 import pandas as pd
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
 import numpy as np
 import re
-import matplotlib.pyplot as plt
-import plotly.express as px
-import plotly.graph_objects as go
-from pathlib import Path
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_google_genai import ChatGoogleGenerativeAI
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
 import io
+import gzip
 
 # Local imports
-from lib.scraper import SchoolScraper, RAW_DATA_DIR, PARSED_DATA_DIR
+from lib.scraper import SchoolScraper, RAW_DATA_DIR, PARSED_DATA_DIR, LINK_BATCH_SIZE
+from lib.utils import json_loads, json_dumps, school_slug, compact_raw_text
+
+@st.cache_resource
+def get_log_queue_handler():
+    """Start one background listener that writes queued log records to the file and console.
+    
+    Records are formatted by the returned QueueHandler, so the listener's handlers
+    keep their default message-only formatter.
+    """
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, logging.FileHandler("streamlit_scraper.log"), logging.StreamHandler())
+    listener.start()
+    atexit.register(listener.stop)
+    return QueueHandler(log_queue)
+
 
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("streamlit_scraper.log"),
-        logging.StreamHandler()
-    ]
+    handlers=[get_log_queue_handler()]
 )
 logger = logging.getLogger(__name__)
 
+# Limits for concurrent scraping, overall and per website domain
+MAX_CONCURRENT_SCHOOLS = 10
+MAX_CONCURRENT_SCHOOLS_PER_DOMAIN = 2
+
+# Limit on simultaneous Gemini requests when summarizing data chunks
+MAX_CONCURRENT_SUMMARY_CHUNKS = 4
+
+# Characters of a school's raw data sent to Gemini for its individual summary.
+# More is read up front since compacting (dropping repeated lines) shrinks it.
+MAX_SUMMARY_RAW_CHARS = 15000
+SUMMARY_RAW_READ_CHARS = MAX_SUMMARY_RAW_CHARS * 4
+
+
 # Utility function to handle asyncio within Streamlit
 async def process_schools_async(schools_to_process, scraper, progress_bar, status_text):
-    """Process selected schools asynchronously"""
-    results = []
+    """Process selected schools concurrently, bounded overall and per domain"""
+    total_schools = len(schools_to_process)
+    completed_schools = 0
+    school_semaphore = asyncio.Semaphore(MAX_CONCURRENT_SCHOOLS)
+    domain_semaphores = defaultdict(lambda: asyncio.Semaphore(MAX_CONCURRENT_SCHOOLS_PER_DOMAIN))
     
-    for school in schools_to_process:
-        # First extract the content
-        raw_data_info = await scraper.process_school(school, progress_bar, status_text)
+    async def process_one(school):
+        nonlocal completed_schools
+        domain = urlparse(school.get("link", "")).netloc
+        
+        async with domain_semaphores[domain], school_semaphore:
+            # First extract the content (the shared progress bar is updated per school below)
+            raw_data_info = await scraper.process_school(school, None, status_text)
+            
+            # Then parse the data
+            parsed_data = await scraper.parse_school_data(raw_data_info, status_text)
         
-        # Then parse the data
-        parsed_data = await scraper.parse_school_data(raw_data_info, status_text)
-        results.append(parsed_data)
+        # No await between the read and the write, so this is safe on the event loop
+        completed_schools += 1
+        if progress_bar:
+            progress_bar.progress(completed_schools / total_schools)
         
+        return parsed_data
+    
+    # One HTTP session for this scrape, sized so every school can fetch a full batch of
+    # links at once, and closed on this loop when the scrape ends
+    async with scraper.session_manager.session(max_clients=MAX_CONCURRENT_SCHOOLS * LINK_BATCH_SIZE):
+        outcomes = await asyncio.gather(
+            *(process_one(school) for school in schools_to_process),
+            return_exceptions=True
+        )
+    
+    # Keep the schools that finished and report the ones that failed, instead of
+    # losing the whole batch to one school's error
+    results = []
+    for school, outcome in zip(schools_to_process, outcomes):
+        if isinstance(outcome, BaseException):
+            logger.error(f"Error processing {school.get('name')}: {outcome}", exc_info=outcome)
+            st.error(f"Failed to process {school.get('name')}: {outcome}")
+        else:
+            results.append(outcome)
     return results
 
 
@@ -54,6 +115,858 @@ def run_async(coro):
         raise e
 
 
+@st.cache_resource
+def get_llm(model_name="gemini-1.5-flash-latest", temperature=0, use_llm_cache=True):
+    """Create the Gemini chat model once per model/temperature and reuse its client.
+    
+    With use_llm_cache=False the model skips the on-disk LLM cache, so identical
+    prompts are sent to Gemini again instead of returning the stored response.
+    """
+    # Imported on first use to keep the Gemini client out of app start-up
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    from lib.parse import setup_llm_cache
+    
+    setup_llm_cache()
+    
+    return ChatGoogleGenerativeAI(
+        model=model_name,
+        temperature=temperature,
+        cache=None if use_llm_cache else False
+    )
+
+
+@st.cache_resource
+def get_scraper():
+    """Create the SchoolScraper once and share it across sessions and reruns"""
+    return SchoolScraper()
+
+
+def get_parsed_files_signature():
+    """Return a cheap (path, mtime, size) fingerprint of the parsed data files.
+    
+    The fingerprint is kept in the session state and only rebuilt, with a single
+    scandir pass, when the directory's own mtime changes. The scraper replaces
+    parsed files instead of rewriting them in place, so re-scrapes change it too.
+    """
+    try:
+        directory_mtime_ns = os.stat(PARSED_DATA_DIR).st_mtime_ns
+    except FileNotFoundError:
+        return ()
+    
+    cached_index = st.session_state.get("_parsed_index")
+    if cached_index and cached_index[0] == directory_mtime_ns:
+        return cached_index[1]
+    
+    signature = []
+    with os.scandir(PARSED_DATA_DIR) as entries:
+        for entry in entries:
+            if entry.name.endswith("_parsed.json") and entry.is_file():
+                stat = entry.stat()
+                signature.append((entry.path, stat.st_mtime_ns, stat.st_size))
+    signature = tuple(sorted(signature))
+    
+    st.session_state["_parsed_index"] = (directory_mtime_ns, signature)
+    return signature
+
+
+def get_mtime_ns(file_path):
+    """Return a file's mtime in nanoseconds, or None if the file does not exist"""
+    try:
+        return file_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@st.cache_data(show_spinner=False, ttl=300)
+def read_raw_preview(raw_file_path, mtime_ns, length=2000):
+    """Read only the first characters of a raw data file for the preview"""
+    with open(raw_file_path, "r", encoding="utf-8") as f:
+        return f.read(length)
+
+
+@st.cache_data(show_spinner=False, ttl=300)
+def read_raw_bytes(raw_file_path, mtime_ns):
+    """Read a whole raw data file as bytes for download, re-read only when its mtime changes"""
+    return raw_file_path.read_bytes()
+
+
+def read_raw_excerpt(raw_file_path, marker=b"MAIN PAGE CONTENT:", length=1000):
+    """Return `length` bytes of a raw data file starting at `marker`, or None if not found.
+    
+    The file is memory-mapped so only the pages around the marker are read.
+    """
+    with open(raw_file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            content_start = mm.find(marker)
+            if content_start <= 0:
+                return None
+            return mm[content_start:content_start + length].decode("utf-8", errors="ignore")
+
+
+def read_parsed_file(file_path):
+    """Decode a parsed school file, or None on failure or when it is not a named school result"""
+    try:
+        with open(file_path, "rb") as f:
+            data = json_loads(f.read())
+    except Exception as e:
+        logger.error(f"Error loading parsed data file {file_path}: {e}")
+        return None
+    if not isinstance(data, dict) or "name" not in data:
+        logger.error(f"Error loading parsed data file {file_path}: not a school result with a name")
+        return None
+    return data
+
+
+def map_parsed_files(read_file, signature):
+    """Apply read_file to every file in the signature on a thread pool.
+    
+    Results keep the signature's file order; files that failed to read are skipped.
+    """
+    file_paths = [file_path for file_path, _, _ in signature]
+    if not file_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(32, len(file_paths))) as executor:
+        return [value for value in executor.map(read_file, file_paths) if value is not None]
+
+
+@st.cache_data(show_spinner=False)
+def load_parsed_results(signature):
+    """Load all parsed school files listed in the signature.
+    
+    The signature changes whenever a file is added, removed or rewritten, so the
+    cached results are only rebuilt after a new scrape instead of on every rerun.
+    """
+    return map_parsed_files(read_parsed_file, signature)
+
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def get_result_json(school_name, signature, session_results_key, _result):
+    """Serialize a school result for download.
+    
+    Results only change when the parsed files or the session results do, so the
+    JSON is cached on the school name and those two keys instead of hashing the result.
+    """
+    return json_dumps(_result)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_export_excel(signature, session_results_key, _all_results):
+    """Build the Excel export once per parsed files signature and set of session results.
+    
+    Results scraped in this session may not be on disk, so they are identified by
+    the key stored alongside them when the scrape finished; everything else is
+    covered by the parsed files signature. The bytes are
+    immutable, so they are kept as a shared resource rather than copied on each rerun.
+    
+    Returns (bytes, build time) so the download name matches the workbook's
+    Export Date, or None if the export failed.
+    """
+    exported_at = datetime.now()
+    excel_data = export_results_to_excel(_all_results, exported_at)
+    return (excel_data.getvalue(), exported_at) if excel_data else None
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_export_combined_json(signature, session_results_key, _all_results):
+    """Serialize all results for the combined JSON download, cached like get_export_excel"""
+    return json_dumps(_all_results)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_export_combined_json_gz(signature, session_results_key, _all_results):
+    """Gzip the combined JSON download once per result set"""
+    return gzip.compress(get_export_combined_json(signature, session_results_key, _all_results), compresslevel=6)
+
+
+# Placeholder the parser stores for a whole section it found nothing for
+NO_INFORMATION = "No information available"
+
+
+def section_value(result, field):
+    """Return a result section, or None when it is empty or the no-information placeholder"""
+    value = result.get(field)
+    if value and value != NO_INFORMATION:
+        return value
+    return None
+
+
+# Placeholder strings the parser emits for fields it could not fill
+MISSING_VALUE_STRINGS = frozenset({"None", "", "-"})
+
+
+def is_missing(value):
+    """Return True for None and the parser's placeholder strings for missing values"""
+    return value is None or (isinstance(value, str) and value in MISSING_VALUE_STRINGS)
+
+
+# Comparison View field -> result field
+COMPARISON_FIELDS = {
+    "Tuition Info": "school_fee",
+    "Program Info": "program",
+    "Enrollment Info": "enrollment_process",
+    "Events Info": "events",
+    "Scholarship Info": "discounts_scholarships",
+    "Contact Info": "contact_info"
+}
+COMPARISON_FIELD_NAMES = tuple(COMPARISON_FIELDS)
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_comparison_df(comparison_fields, signature, session_results_key, _all_results):
+    """Build the Comparison View table, cached on the selected fields and the same results keys as the exports"""
+    # Build each flag column straight into a bool array, so pandas and Arrow skip dtype inference
+    comparison_data = {"School": [result["name"] for result in _all_results]}
+    for display_name, field_name in COMPARISON_FIELDS.items():
+        if display_name in comparison_fields:
+            comparison_data[display_name] = np.fromiter(
+                (result.get(field_name) != NO_INFORMATION for result in _all_results),
+                dtype=bool,
+                count=len(_all_results)
+            )
+    return pd.DataFrame(comparison_data)
+
+
+def build_tuition_table(tuition_by_level):
+    """Build the tuition-by-level table from levels with at least one fee, or None if there are none"""
+    table = {"Grade Level": [], "Annual Fee": [], "Semester 1": [], "Semester 2": []}
+    for level, details in tuition_by_level.items():
+        if not isinstance(details, dict):
+            continue
+        fees = (details.get("annual"), details.get("semester1"), details.get("semester2"))
+        # Only add to table if there's at least one non-None value
+        if all(map(is_missing, fees)):
+            continue
+        table["Grade Level"].append(level)
+        for column, fee in zip(("Annual Fee", "Semester 1", "Semester 2"), fees):
+            table[column].append("-" if is_missing(fee) else fee)
+    if not table["Grade Level"]:
+        return None
+    return pd.DataFrame(table)
+
+
+def build_entries_table(entries, columns, required):
+    """Flatten fee or due-date entries into a table with the given column labels, or None if none have a required field"""
+    first_key = next(iter(columns))
+    # Plain-text entries go in the first column
+    records = [
+        entry if isinstance(entry, dict) else {first_key: str(entry)}
+        for entry in entries
+        if isinstance(entry, dict) or not is_missing(entry)
+    ]
+    frame = pd.json_normalize(records, max_level=0).reindex(columns=list(columns))
+    frame = frame.where(frame.ne("")).dropna(how="all", subset=list(required))
+    if frame.empty:
+        return None
+    return frame.rename(columns=columns).fillna("-")
+
+
+def build_school_status_df(school_names, scraped_names):
+    """Build the scraping status table for the given schools in one vectorized pass"""
+    school_names = pd.Series(school_names, dtype=object)
+    is_scraped = school_names.isin(scraped_names).to_numpy()
+    return pd.DataFrame({
+        "School": school_names,
+        "Status": np.where(is_scraped, "✅ Already scraped", "❌ Not scraped yet")
+    })
+
+
+def render_programs_markdown(programs):
+    """Build the markdown for the Programs tab"""
+    if not isinstance(programs, list):
+        return str(programs)
+    
+    blocks = []
+    for program in programs:
+        if isinstance(program, dict):
+            header = program.get("name", "")
+            if program.get("grade_level"):
+                header += f" ({program['grade_level']})"
+            
+            blocks.append(f"**{header}**")
+            if program.get("description"):
+                blocks.append(program["description"])
+        else:
+            blocks.append(f"- {program}")
+    return "\n\n".join(blocks)
+
+
+def render_enrollment_markdown(enrollment_data):
+    """Build the markdown for the Enrollment tab"""
+    if not isinstance(enrollment_data, dict):
+        return str(enrollment_data)
+    
+    blocks = []
+    
+    # Requirements
+    if enrollment_data.get("requirements"):
+        blocks.append("### Enrollment Requirements")
+        blocks.append("\n".join(f"- {req}" for req in enrollment_data["requirements"]))
+    
+    # Required Documents
+    if enrollment_data.get("documents"):
+        blocks.append("### Required Documents")
+        blocks.append("\n".join(f"- {doc}" for doc in enrollment_data["documents"]))
+    
+    # Process Steps
+    if enrollment_data.get("process_steps"):
+        blocks.append("### Application Process")
+        for step in enrollment_data["process_steps"]:
+            if isinstance(step, dict):
+                step_num = step.get("step", "")
+                desc = step.get("description", "")
+                if step_num:
+                    blocks.append(f"**Step {step_num}**: {desc}")
+                else:
+                    blocks.append(f"- {desc}")
+            else:
+                blocks.append(f"- {step}")
+    return "\n\n".join(blocks)
+
+
+def render_events_markdown(events):
+    """Build the markdown for the Upcoming Events column"""
+    if not isinstance(events, list):
+        return str(events)
+    
+    blocks = []
+    for event in events:
+        if isinstance(event, dict):
+            header = event.get("name", "")
+            if event.get("date"):
+                header += f" ({event['date']})"
+            
+            blocks.append(f"**{header}**")
+            if event.get("description"):
+                blocks.append(event["description"])
+        else:
+            blocks.append(f"- {event}")
+    return "\n\n".join(blocks)
+
+
+def render_scholarships_markdown(scholarships):
+    """Build the markdown for the Scholarships & Discounts column"""
+    if not isinstance(scholarships, list):
+        return str(scholarships)
+    
+    blocks = []
+    for scholarship in scholarships:
+        if isinstance(scholarship, dict):
+            blocks.append(f"**{scholarship.get('name', '')}**")
+            if scholarship.get("amount"):
+                blocks.append(f"*Amount:* {scholarship['amount']}")
+            if scholarship.get("eligibility"):
+                blocks.append(f"*Eligibility:* {scholarship['eligibility']}")
+            if scholarship.get("description"):
+                blocks.append(scholarship["description"])
+        else:
+            blocks.append(f"- {scholarship}")
+    return "\n\n".join(blocks)
+
+
+def bullet_list(items):
+    """Join items into one markdown bullet list"""
+    return "\n".join(f"- {item}" for item in items)
+
+
+def render_facilities_markdown(facilities):
+    """Build the markdown for the Facilities tab"""
+    if not isinstance(facilities, list):
+        return str(facilities)
+    
+    blocks = []
+    for facility in facilities:
+        if isinstance(facility, dict):
+            # Create header with name and type if available
+            header = facility.get("name", "")
+            if facility.get("type"):
+                header += f" ({facility['type']})"
+            
+            blocks.append(f"**{header}**")
+            if facility.get("description"):
+                blocks.append(facility["description"])
+            
+            # List features if any
+            if facility.get("features"):
+                blocks.append("**Features:**")
+                blocks.append(bullet_list(facility["features"]))
+        else:
+            blocks.append(f"- {facility}")
+    return "\n\n".join(blocks)
+
+
+def render_faculty_markdown(faculty_list):
+    """Build the markdown for the Faculty tab"""
+    if not isinstance(faculty_list, list):
+        return str(faculty_list)
+    
+    blocks = []
+    for faculty in faculty_list:
+        if isinstance(faculty, dict):
+            # Department header with staff count if available
+            header = faculty.get("department", "")
+            if faculty.get("staff_count"):
+                header += f" ({faculty['staff_count']} staff)"
+            
+            blocks.append(f"### {header}")
+            if faculty.get("qualifications"):
+                blocks.append(f"**Qualifications:** {faculty['qualifications']}")
+            
+            # List notable faculty members if any
+            if faculty.get("notable_members"):
+                blocks.append("**Notable Faculty Members:**")
+                for member in faculty["notable_members"]:
+                    if isinstance(member, dict):
+                        member_text = member.get("name", "")
+                        if member.get("position"):
+                            member_text += f" - {member['position']}"
+                        
+                        blocks.append(f"**{member_text}**")
+                        if member.get("bio"):
+                            blocks.append(member["bio"])
+        else:
+            blocks.append(str(faculty))
+    return "\n\n".join(blocks)
+
+
+def render_achievements_markdown(achievements):
+    """Build the markdown for the Achievements tab"""
+    if not isinstance(achievements, list):
+        return str(achievements)
+    
+    blocks = []
+    for achievement in achievements:
+        if isinstance(achievement, dict):
+            # Create header with name and year if available
+            header = achievement.get("name", "")
+            if achievement.get("year"):
+                header += f" ({achievement['year']})"
+            
+            blocks.append(f"**{header}**")
+            if achievement.get("type"):
+                blocks.append(f"*Type:* {achievement['type']}")
+            if achievement.get("issuing_body"):
+                blocks.append(f"*Issuing Body:* {achievement['issuing_body']}")
+            if achievement.get("description"):
+                blocks.append(achievement["description"])
+        else:
+            blocks.append(f"- {achievement}")
+    return "\n\n".join(blocks)
+
+
+def render_technical_markdown(tech_data):
+    """Build the markdown for the Technical Infrastructure column"""
+    if not isinstance(tech_data, dict):
+        return str(tech_data)
+    
+    blocks = []
+    if tech_data.get("technology_infrastructure"):
+        blocks.append(f"**Infrastructure:** {tech_data['technology_infrastructure']}")
+    if tech_data.get("learning_management_system"):
+        blocks.append(f"**Learning Management System:** {tech_data['learning_management_system']}")
+    if tech_data.get("digital_platforms"):
+        blocks.append("**Digital Platforms:**")
+        blocks.append(bullet_list(tech_data["digital_platforms"]))
+    if tech_data.get("tech_initiatives"):
+        blocks.append("**Tech Initiatives:**")
+        blocks.append(bullet_list(tech_data["tech_initiatives"]))
+    return "\n\n".join(blocks)
+
+
+def render_marketing_markdown(marketing):
+    """Build the markdown for the Marketing & Branding column"""
+    if not isinstance(marketing, dict):
+        return str(marketing)
+    
+    blocks = []
+    for key, label in (("taglines", "Taglines"), ("value_propositions", "Value Propositions"), ("key_messaging", "Key Messaging")):
+        if marketing.get(key):
+            blocks.append(f"**{label}:**")
+            blocks.append(bullet_list(marketing[key]))
+    if marketing.get("content_strategy"):
+        blocks.append(f"**Content Strategy:** {marketing['content_strategy']}")
+    return "\n\n".join(blocks)
+
+
+def render_clubs_activities_markdown(student_life):
+    """Build the markdown for the clubs and activities column of the Student Life tab"""
+    blocks = []
+    if student_life.get("clubs_organizations"):
+        blocks.append("### Clubs & Organizations")
+        for club in student_life["clubs_organizations"]:
+            if isinstance(club, dict):
+                blocks.append(f"**{club.get('name', '')}**")
+                if club.get("description"):
+                    blocks.append(club["description"])
+            else:
+                blocks.append(f"- {club}")
+    
+    if student_life.get("activities"):
+        blocks.append("### Activities")
+        blocks.append(bullet_list(student_life["activities"]))
+    return "\n\n".join(blocks)
+
+
+def render_testimonials_partnerships_markdown(student_life):
+    """Build the markdown for the testimonials and partnerships column of the Student Life tab"""
+    blocks = []
+    if student_life.get("testimonials"):
+        blocks.append("### Testimonials")
+        for testimonial in student_life["testimonials"]:
+            if isinstance(testimonial, dict):
+                blocks.append(f"*\"{testimonial.get('quote', '')}\"*")
+                if testimonial.get("source"):
+                    blocks.append(f"— {testimonial['source']}")
+            else:
+                blocks.append(str(testimonial))
+    
+    if student_life.get("partnerships"):
+        blocks.append("### Partnerships")
+        for partnership in student_life["partnerships"]:
+            if isinstance(partnership, dict):
+                blocks.append(f"**{partnership.get('partner', '')}**")
+                if partnership.get("nature"):
+                    blocks.append(f"*Nature:* {partnership['nature']}")
+            else:
+                blocks.append(f"- {partnership}")
+    return "\n\n".join(blocks)
+
+
+def render_contact_markdown(contact_data):
+    """Build the markdown for the Contact Information column"""
+    if not isinstance(contact_data, dict):
+        return str(contact_data)
+    
+    blocks = []
+    if contact_data.get("address"):
+        blocks.append(f"**Address:** {contact_data['address']}")
+    if contact_data.get("phone_numbers"):
+        blocks.append("**Phone Numbers:**")
+        blocks.append(bullet_list(contact_data["phone_numbers"]))
+    if contact_data.get("email"):
+        blocks.append(f"**Email:** {contact_data['email']}")
+    if contact_data.get("website"):
+        blocks.append(f"**Website:** [{contact_data['website']}]({contact_data['website']})")
+    if contact_data.get("social_media"):
+        blocks.append("**Social Media:**")
+        blocks.append("\n".join(f"- {platform.capitalize()}: [{url}]({url})" for platform, url in contact_data["social_media"].items()))
+    return "\n\n".join(blocks)
+
+
+# Rendering schema for the markdown-only info sections: field -> (markdown builder, message when empty)
+MARKDOWN_SECTIONS = {
+    "programs": (render_programs_markdown, "No program information available for this school"),
+    "enrollment": (render_enrollment_markdown, "No enrollment information available for this school"),
+    "events": (render_events_markdown, "No upcoming events information available"),
+    "scholarships": (render_scholarships_markdown, "No scholarship information available"),
+    "facilities": (render_facilities_markdown, "No facilities information available"),
+    "faculty": (render_faculty_markdown, "No faculty information available"),
+    "achievements": (render_achievements_markdown, "No achievement information available"),
+    "technical_data": (render_technical_markdown, "No technical data available"),
+    "marketing_content": (render_marketing_markdown, "No marketing information available"),
+    "contact": (render_contact_markdown, "No contact information available"),
+}
+
+
+def render_academic_year_fees(fee_data):
+    """Render structured fee data: academic year, tuition by level, other fees and due dates"""
+    st.subheader(f"Academic Year: {fee_data.get('academic_year', '')}")
+    # Display tuition by level in a table if available
+    if "tuition_by_level" in fee_data and fee_data["tuition_by_level"]:
+        # Heading and per-level notes are emitted as one markdown block
+        tuition_blocks = ["### Tuition by Grade Level"]
+    
+        for level, details in fee_data["tuition_by_level"].items():
+            if isinstance(details, dict):
+                # If there's a description, display it separately
+                if "description" in details and details["description"]:
+                    tuition_blocks.append(f"**{level}** - {details['description']}")
+            else:
+                # Handle non-dict case
+                if details and not is_missing(details):
+                    tuition_blocks.append(f"**{level}**: {details}")
+    
+        st.markdown("\n\n".join(tuition_blocks))
+    
+        # Display the table if we have data
+        tuition_table = build_tuition_table(fee_data["tuition_by_level"])
+        if tuition_table is not None:
+            st.dataframe(tuition_table, use_container_width=True, hide_index=True)
+        else:
+            st.info("No specific tuition fee information available for grade levels")
+    # Display other fees
+    if "other_fees" in fee_data and fee_data["other_fees"]:
+        st.markdown("### Other Fees")
+    
+        other_fees_table = build_entries_table(
+            fee_data["other_fees"],
+            {"name": "Fee Type", "amount": "Amount", "description": "Description"},
+            required=("name", "amount"),
+        )
+    
+        # Display as a table if we have data
+        if other_fees_table is not None:
+            st.dataframe(other_fees_table, use_container_width=True, hide_index=True)
+        else:
+            st.info("No specific other fees information available")
+    # Display due dates
+    if "due_dates" in fee_data and fee_data["due_dates"]:
+        st.markdown("### Payment Due Dates")
+    
+        due_dates_table = build_entries_table(
+            fee_data["due_dates"],
+            {"period": "Payment Period", "date": "Due Date"},
+            required=("period", "date"),
+        )
+    
+        # Display as a table if we have data
+        if due_dates_table is not None:
+            st.dataframe(due_dates_table, use_container_width=True, hide_index=True)
+        else:
+            st.info("No specific payment due dates information available")
+
+
+def render_tuition_by_level_fees(fee_data):
+    """Render fee data that only has a tuition-by-level mapping"""
+    st.subheader("Tuition Fee Information")
+    tuition_table = build_tuition_table(fee_data["tuition_by_level"])
+    if tuition_table is not None:
+        st.dataframe(tuition_table, use_container_width=True, hide_index=True)
+    else:
+        st.info("No specific tuition fee information available")
+
+
+def render_raw_fees(fee_data):
+    """Render fee data in any other format as formatted JSON"""
+    st.subheader("Tuition Fee Information")
+    st.json(fee_data)
+
+
+def fee_data_format(fee_data):
+    """Tag fee data with its format, so the Tuition Fees tab checks the shape only once"""
+    if not isinstance(fee_data, dict):
+        return "raw"
+    if "academic_year" in fee_data:
+        return "academic_year"
+    if isinstance(fee_data.get("tuition_by_level"), dict):
+        return "tuition_by_level"
+    return "raw"
+
+
+# Renderer for each fee data format
+FEE_DATA_RENDERERS = {
+    "academic_year": render_academic_year_fees,
+    "tuition_by_level": render_tuition_by_level_fees,
+    "raw": render_raw_fees,
+}
+
+
+def render_markdown_section(result, field):
+    """Render one info section of a school result as a single markdown block"""
+    build_markdown, empty_message = MARKDOWN_SECTIONS[field]
+    value = section_value(result, field)
+    if value is not None:
+        st.markdown(build_markdown(value))
+    else:
+        st.info(empty_message)
+
+
+@st.fragment
+def render_school_details(results_by_name, school_names, parsed_signature):
+    """Render the School Details view; its widgets rerun only this fragment, not the whole app"""
+    # Create a selector for schools
+    selected_school = st.selectbox(
+        "Select a school to view details",
+        options=school_names
+    )
+    
+    # Get the selected school data
+    result = results_by_name.get(selected_school)
+    
+    if result:
+        # File-name form of the school name, shared by the download and raw data paths
+        slug = school_slug(result["name"])
+        st.header(result["name"])
+        st.markdown(f"[Visit Website]({result.get('link', '#')})")
+    
+        # Information categories, shown as a horizontal selector
+        info_sections = [
+            "Tuition Fees", 
+            "Programs", 
+            "Enrollment", 
+            "Events & Scholarships", 
+            "Facilities",
+            "Faculty",
+            "Achievements",
+            "Technical & Marketing",
+            "Student Life",
+            "Contact & Raw Data"
+        ]
+        # Only the selected section's body runs on a rerun, unlike st.tabs which builds all of them
+        active_section = st.radio(
+            "Section",
+            info_sections,
+            horizontal=True,
+            key=f"info_section_{result['name']}",
+            label_visibility="collapsed"
+        )
+    
+        # Tuition Fees Tab
+        if active_section == "Tuition Fees":
+            fee_data = section_value(result, "school_fee")
+            if fee_data is not None:
+                FEE_DATA_RENDERERS[fee_data_format(fee_data)](fee_data)
+            else:
+                st.info("No tuition fee information available for this school")
+    
+        # Programs Tab
+        if active_section == "Programs":
+            render_markdown_section(result, "programs")
+    
+        # Enrollment Tab
+        if active_section == "Enrollment":
+            render_markdown_section(result, "enrollment")
+    
+        # Events & Scholarships Tab
+        if active_section == "Events & Scholarships":
+            col1, col2 = st.columns(2)
+    
+            # Events column
+            with col1:
+                st.subheader("Upcoming Events")
+                render_markdown_section(result, "events")
+    
+            # Scholarships column
+            with col2:
+                st.subheader("Scholarships & Discounts")
+                render_markdown_section(result, "scholarships")
+    
+        # Facilities Tab
+        if active_section == "Facilities":
+            st.subheader("Facilities")
+            render_markdown_section(result, "facilities")
+    
+        # Faculty Tab
+        if active_section == "Faculty":
+            st.subheader("Faculty Information")
+            render_markdown_section(result, "faculty")
+    
+        # Achievements Tab
+        if active_section == "Achievements":
+            st.subheader("Achievements & Accreditations")
+            render_markdown_section(result, "achievements")
+    
+        # Technical & Marketing Tab
+        if active_section == "Technical & Marketing":
+            col1, col2 = st.columns(2)
+    
+            # Technical Data column
+            with col1:
+                st.subheader("Technical Infrastructure")
+                render_markdown_section(result, "technical_data")
+    
+            # Marketing column
+            with col2:
+                st.subheader("Marketing & Branding")
+                render_markdown_section(result, "marketing_content")
+    
+        # Student Life Tab
+        if active_section == "Student Life":
+            st.subheader("Student Life")
+            student_life = section_value(result, "student_life")
+            if student_life is not None:
+                if isinstance(student_life, dict):
+                    if student_life.get("campus_life"):
+                        st.markdown(f"**Campus Life Overview:** {student_life['campus_life']}")
+    
+                    # Create columns for better organization
+                    col1, col2 = st.columns(2)
+    
+                    with col1:
+                        st.markdown(render_clubs_activities_markdown(student_life))
+    
+                    with col2:
+                        st.markdown(render_testimonials_partnerships_markdown(student_life))
+                else:
+                    st.markdown(student_life)
+            else:
+                st.info("No student life information available")
+    
+        # Contact & Raw Data Tab
+        if active_section == "Contact & Raw Data":
+            col1, col2 = st.columns(2)
+    
+            # Contact info column
+            with col1:
+                st.subheader("Contact Information")
+                render_markdown_section(result, "contact")
+    
+            # Notes and raw data column
+            with col2:
+                # Notes, unless they only record a parsing error
+                notes = section_value(result, "notes")
+                if notes is not None and "Error" not in notes:
+                    st.subheader("Notes")
+                    st.markdown(notes)
+    
+                # Option to download the JSON file
+                json_data = get_result_json(result["name"], parsed_signature, st.session_state.get("results_key"), result)
+                st.download_button(
+                    label="Download JSON data",
+                    data=json_data,
+                    file_name=f"{slug}_data.json",
+                    mime="application/json"
+                )
+    
+                # Show raw data file path
+                raw_file_path = RAW_DATA_DIR / f"{slug}_raw.txt"
+                raw_mtime_ns = get_mtime_ns(raw_file_path)
+                if raw_mtime_ns is not None:
+                    st.subheader("Raw Data")
+                    # Read-only preview, collapsed by default instead of an editable text area
+                    with st.expander("Raw Content (First 2000 chars)", expanded=False):
+                        st.code(read_raw_preview(str(raw_file_path), raw_mtime_ns), language="text")
+                    st.text(f"Full raw data saved at: {raw_file_path}")
+
+
+# Descriptions shown above the Summary tab's two views
+COMPREHENSIVE_SUMMARY_DESCRIPTION = """
+Generate a comprehensive market analysis that compares all scraped schools together.
+
+This analysis will provide:
+- Market overview of all schools
+- Comparative tuition analysis across different pricing tiers
+- Analysis of academic programs and curricula across schools
+- Campus facilities comparison
+- Faculty and staff analysis
+- Achievements and accreditations comparison
+- Summary of admission requirements and processes
+- Student life and extracurricular activities
+- Technology infrastructure comparison
+- Marketing and positioning analysis
+- Distinctive features of each school
+- Recommendations for different types of students/families
+"""
+
+INDIVIDUAL_SUMMARY_DESCRIPTION = """
+Generate an AI summary for an individual school based on its scraped data.
+
+Each summary provides a comprehensive overview of:
+- School philosophy and overview
+- Academic programs and curriculum
+- Tuition fees and financial information
+- Enrollment requirements and process
+- Campus facilities and infrastructure
+- Faculty qualifications and notable staff
+- Achievements, accreditations, and recognitions
+- Marketing approach and brand positioning
+- Technology infrastructure and digital learning
+- Student life, clubs, and campus culture
+- Unique features and distinctive offerings
+"""
+
+
 # Main Streamlit app
 def main():
     st.set_page_config(
@@ -64,12 +977,16 @@ def main():
     
     st.title("🔍 AI School Web Scraper")
     
-    # Initialize the scraper on first run
-    if 'scraper' not in st.session_state:
-        st.session_state.scraper = SchoolScraper()
+    # Get the shared scraper instance
+    scraper = get_scraper()
         
     # Get schools list
-    schools_data = st.session_state.scraper.schools_data
+    schools_data = scraper.schools_data
+    
+    # Fingerprint of the parsed data files, and the parsed results loaded once for
+    # both the Scrape and Results tabs
+    parsed_signature = get_parsed_files_signature()
+    parsed_results = load_parsed_results(parsed_signature)
     
     # Create main tabs for app sections
     main_tabs = st.tabs(["Home", "Scrape Schools", "Results", "Summary", "Export Data", "About"])
@@ -119,33 +1036,19 @@ def main():
         st.header("Select Schools to Scrape")
         
         # Get previously scraped school names from parsed data directory
-        previously_scraped_schools = []
-        if os.path.exists(PARSED_DATA_DIR):
-            parsed_files = list(PARSED_DATA_DIR.glob("*_parsed.json"))
-            for file_path in parsed_files:
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        school_data = json.load(f)
-                    previously_scraped_schools.append(school_data["name"])
-                except Exception as e:
-                    logger.error(f"Error loading parsed data file {file_path}: {e}")
+        previously_scraped_schools = {school_data["name"] for school_data in parsed_results}
         
         # Get all school names for multiselect
         all_school_names = [school.get("name") for school in schools_data]
         
-        # Create a dataframe with school names and their scraped status
-        school_status_data = []
-        for school_name in all_school_names:
-            is_scraped = school_name in previously_scraped_schools
-            school_status_data.append({
-                "School": school_name,
-                "Status": "✅ Already scraped" if is_scraped else "❌ Not scraped yet"
-            })
-        
-        # Display the status table
+        # Display the status table in a placeholder, so it can be refreshed after a scrape
         st.subheader("School Scraping Status")
-        school_status_df = pd.DataFrame(school_status_data)
-        st.dataframe(school_status_df, use_container_width=True, hide_index=True)
+        status_table = st.empty()
+        status_table.dataframe(
+            build_school_status_df(all_school_names, previously_scraped_schools),
+            use_container_width=True,
+            hide_index=True
+        )
         
         # Use multiselect for school selection
         selected_school_names = st.multiselect(
@@ -155,14 +1058,11 @@ def main():
             help="Select one or more schools to scrape data from"
         )
         
-        # Get the full school data for selected schools
-        selected_schools = [school for school in schools_data if school.get("name") in selected_school_names]
-        
         # Start scraping button
         col1, col2 = st.columns([3, 1])
         with col2:
             start_button = st.button("Start Scraping", 
-                                    disabled=len(selected_schools) == 0,
+                                    disabled=len(selected_school_names) == 0,
                                     use_container_width=True,
                                     type="primary")
         
@@ -171,7 +1071,10 @@ def main():
             st.info("Please select at least one school to begin.")
         
         # Main area for displaying scraping progress
-        if start_button and selected_schools:
+        if start_button and selected_school_names:
+            # Get the full school data for selected schools (only needed once scraping starts)
+            selected_schools = [scraper.schools_by_name[name] for name in selected_school_names if name in scraper.schools_by_name]
+            
             # Create a progress bar
             progress_bar = st.progress(0)
             status_text = st.empty()
@@ -182,11 +1085,10 @@ def main():
             try:
                 status_text.text("Starting scraping process...")
                 
-                # Rerun the app to update the UI with the new results
                 with st.spinner("Scraping and processing school data..."):
                     results = run_async(process_schools_async(
                         selected_schools,
-                        st.session_state.scraper,
+                        scraper,
                         progress_bar,
                         status_text
                     ))
@@ -195,16 +1097,25 @@ def main():
                 progress_bar.progress(1.0)
                 status_text.text("Processing complete!")
                 
-                # Switch to Results tab when complete
+                # The tabs below render after this one, so they pick up the new results in this
+                # same run instead of a full rerun; only the status table above needs refreshing
                 st.session_state.results = results
-                st.rerun()  # Rerun to update the UI with the new results
+                # Session results only change here, so fingerprint them once for the export caches
+                st.session_state.results_key = (datetime.now().isoformat(), tuple(result["name"] for result in results))
+                # Failed parses come back as error placeholders and have no parsed file, so they stay unscraped
+                previously_scraped_schools.update(
+                    result["name"] for result in results
+                    if not str(result.get("notes", "")).startswith("Error during parsing")
+                )
+                status_table.dataframe(
+                    build_school_status_df(all_school_names, previously_scraped_schools),
+                    use_container_width=True,
+                    hide_index=True
+                )
             
             except Exception as e:
                 st.error(f"An error occurred during the scraping process: {str(e)}")
                 logger.error(f"Error in Streamlit app: {e}", exc_info=True)
-            finally:
-                # Close resources
-                run_async(st.session_state.scraper.close())
     
     # Results Tab
     with main_tabs[2]:
@@ -215,25 +1126,21 @@ def main():
         if 'results' in st.session_state and st.session_state.results:
             all_results.extend(st.session_state.results)
         
-        # Load previously scraped schools from parsed_data directory
-        if os.path.exists(PARSED_DATA_DIR):
-            parsed_files = list(PARSED_DATA_DIR.glob("*_parsed.json"))
-            
-            # Get names of schools already in all_results to avoid duplicates
-            existing_school_names = [school["name"] for school in all_results]
-            
-            # Load each parsed school file and add to results if not already present
-            for file_path in parsed_files:
-                try:
-                    with open(file_path, "r", encoding="utf-8") as f:
-                        school_data = json.load(f)
-                        
-                    # Only add if not already in results (avoid duplicates)
-                    if school_data["name"] not in existing_school_names:
-                        all_results.append(school_data)
-                        existing_school_names.append(school_data["name"])
-                except Exception as e:
-                    logger.error(f"Error loading parsed data file {file_path}: {e}")
+        # Load previously scraped schools from parsed_data directory (cached between reruns)
+        # Get names of schools already in all_results to avoid duplicates
+        existing_school_names = {school["name"] for school in all_results}
+        
+        # Add each parsed school to results if not already present
+        for school_data in parsed_results:
+            # Only add if not already in results (avoid duplicates)
+            if school_data["name"] not in existing_school_names:
+                all_results.append(school_data)
+                existing_school_names.add(school_data["name"])
+        
+        # Index results by school name for direct lookups
+        results_by_name = {result["name"]: result for result in all_results}
+        # School names in display order, shared by the school selectors in every tab
+        school_names = tuple(results_by_name)
         
         if all_results:
             st.header("School Information")
@@ -245,641 +1152,29 @@ def main():
                 
                 # School Details Tab
                 with result_tabs[0]:
-                    # Create a selector for schools
-                    selected_school = st.selectbox(
-                        "Select a school to view details",
-                        options=[result["name"] for result in all_results]
-                    )
-                    
-                    # Get the selected school data
-                    result = next((r for r in all_results if r["name"] == selected_school), None)
-                    
-                    if result:
-                        st.header(result["name"])
-                        st.markdown(f"[Visit Website]({result.get('link', '#')})")
-                          # Create information category tabs
-                        info_tabs = st.tabs([
-                            "Tuition Fees", 
-                            "Programs", 
-                            "Enrollment", 
-                            "Events & Scholarships", 
-                            "Facilities",
-                            "Faculty",
-                            "Achievements",
-                            "Technical & Marketing",
-                            "Student Life",
-                            "Contact & Raw Data"
-                        ])
-                        
-                        # Tuition Fees Tab
-                        with info_tabs[0]:
-                            if result.get("school_fee") and result["school_fee"] != "No information available":
-                                fee_data = result["school_fee"]
-                                if isinstance(fee_data, dict) and "academic_year" in fee_data:
-                                    # Structured format
-                                    st.subheader(f"Academic Year: {fee_data.get('academic_year', '')}")
-                                      # Display tuition by level in a table if available
-                                    if "tuition_by_level" in fee_data and fee_data["tuition_by_level"]:
-                                        st.markdown("### Tuition by Grade Level")
-                                        
-                                        # Create a dataframe for better display
-                                        tuition_data = []
-                                        
-                                        for level, details in fee_data["tuition_by_level"].items():
-                                            if isinstance(details, dict):
-                                                # Extract fee values
-                                                annual = details.get("annual")
-                                                semester1 = details.get("semester1")
-                                                semester2 = details.get("semester2")
-                                                
-                                                # Only add to table if there's at least one non-None value
-                                                if any(value is not None and value != "None" for value in [annual, semester1, semester2]):
-                                                    row = {
-                                                        "Grade Level": level,
-                                                        "Annual Fee": annual if annual not in [None, "None"] else "-",
-                                                        "Semester 1": semester1 if semester1 not in [None, "None"] else "-",
-                                                        "Semester 2": semester2 if semester2 not in [None, "None"] else "-"
-                                                    }
-                                                    tuition_data.append(row)
-                                                
-                                                # If there's a description, display it separately
-                                                if "description" in details and details["description"]:
-                                                    st.markdown(f"**{level}** - {details['description']}")
-                                            else:
-                                                # Handle non-dict case
-                                                if details and details not in [None, "None"]:
-                                                    st.markdown(f"**{level}**: {details}")
-                                        
-                                        # Display the table if we have data
-                                        if tuition_data:
-                                            st.dataframe(pd.DataFrame(tuition_data), use_container_width=True, hide_index=True)
-                                        else:
-                                            st.info("No specific tuition fee information available for grade levels")
-                                      # Display other fees
-                                    if "other_fees" in fee_data and fee_data["other_fees"]:
-                                        st.markdown("### Other Fees")
-                                        
-                                        # Create a table for other fees
-                                        other_fees_data = []
-                                        
-                                        for fee in fee_data["other_fees"]:
-                                            if isinstance(fee, dict):
-                                                fee_name = fee.get("name", "")
-                                                fee_amount = fee.get("amount", "")
-                                                fee_desc = fee.get("description", "")
-                                                
-                                                # Only add if we have a name or amount
-                                                if fee_name or fee_amount:
-                                                    row = {
-                                                        "Fee Type": fee_name if fee_name else "-",
-                                                        "Amount": fee_amount if fee_amount else "-",
-                                                        "Description": fee_desc if fee_desc else "-"
-                                                    }
-                                                    other_fees_data.append(row)
-                                            elif fee and fee not in [None, "None"]:
-                                                # Handle string case
-                                                other_fees_data.append({
-                                                    "Fee Type": fee,
-                                                    "Amount": "-",
-                                                    "Description": "-"
-                                                })
-                                        
-                                        # Display as a table if we have data
-                                        if other_fees_data:
-                                            st.dataframe(pd.DataFrame(other_fees_data), use_container_width=True, hide_index=True)
-                                        else:
-                                            st.info("No specific other fees information available")
-                                      # Display due dates
-                                    if "due_dates" in fee_data and fee_data["due_dates"]:
-                                        st.markdown("### Payment Due Dates")
-                                        
-                                        # Create a table for due dates
-                                        due_dates_data = []
-                                        
-                                        for date_info in fee_data["due_dates"]:
-                                            if isinstance(date_info, dict):
-                                                period = date_info.get("period", "")
-                                                due_date = date_info.get("date", "")
-                                                
-                                                # Only add if there's a period or date
-                                                if period or due_date:
-                                                    due_dates_data.append({
-                                                        "Payment Period": period if period else "-",
-                                                        "Due Date": due_date if due_date else "-"
-                                                    })
-                                            elif date_info and date_info not in [None, "None"]:
-                                                # Handle string case
-                                                due_dates_data.append({
-                                                    "Payment Information": str(date_info),
-                                                    "Due Date": "-"
-                                                })
-                                        
-                                        # Display as a table if we have data
-                                        if due_dates_data:
-                                            st.dataframe(pd.DataFrame(due_dates_data), use_container_width=True, hide_index=True)
-                                        else:
-                                            st.info("No specific payment due dates information available")                                
-                                    else:
-                                        # Handle other formats of fee data
-                                        st.subheader("Tuition Fee Information")
-                                    
-                                    # If it's just a dictionary with tuition_by_level
-                                    if isinstance(fee_data, dict) and "tuition_by_level" in fee_data:
-                                        # Create a dataframe for better display
-                                        tuition_data = []
-                                        
-                                        for level, details in fee_data["tuition_by_level"].items():
-                                            if isinstance(details, dict):
-                                                # Extract fee values
-                                                annual = details.get("annual")
-                                                semester1 = details.get("semester1")
-                                                semester2 = details.get("semester2")
-                                                
-                                                # Only add to table if there's at least one non-None value
-                                                if any(value is not None and value != "None" for value in [annual, semester1, semester2]):
-                                                    row = {
-                                                        "Grade Level": level,
-                                                        "Annual Fee": annual if annual not in [None, "None"] else "-",
-                                                        "Semester 1": semester1 if semester1 not in [None, "None"] else "-",
-                                                        "Semester 2": semester2 if semester2 not in [None, "None"] else "-"
-                                                    }
-                                                    tuition_data.append(row)
-                                        
-                                        # Display the table if we have data
-                                        if tuition_data:
-                                            st.dataframe(pd.DataFrame(tuition_data), use_container_width=True, hide_index=True)
-                                        else:
-                                            st.info("No specific tuition fee information available")
-                                    else:
-                                        # For any other format, display as formatted JSON
-                                        st.json(fee_data)
-                            else:
-                                st.info("No tuition fee information available for this school")
-                        
-                        # Programs Tab
-                        with info_tabs[1]:
-                            if result.get("programs") and result["programs"] != "No information available":
-                                programs = result["programs"]
-                                if isinstance(programs, list):
-                                    for program in programs:
-                                        if isinstance(program, dict):
-                                            program_name = program.get("name", "")
-                                            grade_level = program.get("grade_level", "")
-                                            description = program.get("description", "")
-                                            
-                                            header = program_name
-                                            if grade_level:
-                                                header += f" ({grade_level})"
-                                            
-                                            st.markdown(f"**{header}**")
-                                            if description:
-                                                st.markdown(description)
-                                        else:
-                                            st.markdown(f"- {program}")
-                                else:
-                                    st.markdown(programs)
-                            else:
-                                st.info("No program information available for this school")
+                    render_school_details(results_by_name, school_names, parsed_signature)
+                
+                # Comparison View Tab
+                with result_tabs[1]:
+                    if len(all_results) > 1:
+                        st.header("School Comparison")
                         
-                        # Enrollment Tab
-                        with info_tabs[2]:
-                            if result.get("enrollment") and result["enrollment"] != "No information available":
-                                enrollment_data = result["enrollment"]
-                                
-                                if isinstance(enrollment_data, dict):
-                                    # Requirements
-                                    if "requirements" in enrollment_data and enrollment_data["requirements"]:
-                                        st.markdown("### Enrollment Requirements")
-                                        requirements = enrollment_data["requirements"]
-                                        for req in requirements:
-                                            st.markdown(f"- {req}")
-                                    
-                                    # Required Documents
-                                    if "documents" in enrollment_data and enrollment_data["documents"]:
-                                        st.markdown("### Required Documents")
-                                        documents = enrollment_data["documents"]
-                                        for doc in documents:
-                                            st.markdown(f"- {doc}")
-                                    
-                                    # Process Steps
-                                    if "process_steps" in enrollment_data and enrollment_data["process_steps"]:
-                                        st.markdown("### Application Process")
-                                        steps = enrollment_data["process_steps"]
-                                        for step in steps:
-                                            if isinstance(step, dict):
-                                                step_num = step.get("step", "")
-                                                desc = step.get("description", "")
-                                                if step_num:
-                                                    st.markdown(f"**Step {step_num}**: {desc}")
-                                                else:
-                                                    st.markdown(f"- {desc}")
-                                            else:
-                                                st.markdown(f"- {step}")
-                                else:
-                                    st.markdown(enrollment_data)
-                            else:
-                                st.info("No enrollment information available for this school")
+                        # Select fields to compare
+                        comparison_fields = st.multiselect(
+                            "Select fields to compare",
+                            options=COMPARISON_FIELD_NAMES,
+                            default=["Tuition Info", "Program Info", "Enrollment Info"]
+                        )
                         
-                        # Events & Scholarships Tab
-                        with info_tabs[3]:
-                            col1, col2 = st.columns(2)
-                            
-                            # Events column
-                            with col1:
-                                st.subheader("Upcoming Events")
-                                if result.get("events") and result["events"] != "No information available":
-                                    events = result["events"]
-                                    if isinstance(events, list):
-                                        for event in events:
-                                            if isinstance(event, dict):
-                                                event_name = event.get("name", "")
-                                                event_date = event.get("date", "")
-                                                event_desc = event.get("description", "")
-                                                
-                                                header = event_name
-                                                if event_date:
-                                                    header += f" ({event_date})"
-                                                
-                                                st.markdown(f"**{header}**")
-                                                if event_desc:
-                                                    st.markdown(event_desc)
-                                            else:
-                                                st.markdown(f"- {event}")
-                                    else:
-                                        st.markdown(events)
-                                else:
-                                    st.info("No upcoming events information available")
-                            
-                            # Scholarships column
-                            with col2:
-                                st.subheader("Scholarships & Discounts")
-                                if result.get("scholarships") and result["scholarships"] != "No information available":
-                                    scholarships = result["scholarships"]
-                                    if isinstance(scholarships, list):
-                                        for scholarship in scholarships:
-                                            if isinstance(scholarship, dict):
-                                                name = scholarship.get("name", "")
-                                                eligibility = scholarship.get("eligibility", "")
-                                                amount = scholarship.get("amount", "")
-                                                description = scholarship.get("description", "")
-                                                
-                                                st.markdown(f"**{name}**")
-                                                if amount:
-                                                    st.markdown(f"*Amount:* {amount}")
-                                                if eligibility:
-                                                    st.markdown(f"*Eligibility:* {eligibility}")
-                                                if description:
-                                                    st.markdown(description)
-                                            else:
-                                                st.markdown(f"- {scholarship}")
-                                    else:
-                                        st.markdown(scholarships)                                
-                                else:
-                                    st.info("No scholarship information available")
-                        
-                        # Facilities Tab
-                        with info_tabs[4]:
-                            st.subheader("Facilities")
-                            if result.get("facilities") and result["facilities"] != "No information available":
-                                facilities = result["facilities"]
-                                if isinstance(facilities, list):
-                                    for facility in facilities:
-                                        if isinstance(facility, dict):
-                                            facility_name = facility.get("name", "")
-                                            facility_type = facility.get("type", "")
-                                            facility_desc = facility.get("description", "")
-                                            facility_features = facility.get("features", [])
-                                            
-                                            # Create header with name and type if available
-                                            header = facility_name
-                                            if facility_type:
-                                                header += f" ({facility_type})"
-                                            
-                                            st.markdown(f"**{header}**")
-                                            if facility_desc:
-                                                st.markdown(facility_desc)
-                                            
-                                            # List features if any
-                                            if facility_features:
-                                                st.markdown("**Features:**")
-                                                for feature in facility_features:
-                                                    st.markdown(f"- {feature}")
-                                        else:
-                                            st.markdown(f"- {facility}")
-                                else:
-                                    st.markdown(facilities)
-                            else:
-                                st.info("No facilities information available")
-                        
-                        # Faculty Tab
-                        with info_tabs[5]:
-                            st.subheader("Faculty Information")
-                            if result.get("faculty") and result["faculty"] != "No information available":
-                                faculty_list = result["faculty"]
-                                if isinstance(faculty_list, list):
-                                    for faculty in faculty_list:
-                                        if isinstance(faculty, dict):
-                                            dept = faculty.get("department", "")
-                                            staff_count = faculty.get("staff_count", "")
-                                            qualifications = faculty.get("qualifications", "")
-                                            notable_members = faculty.get("notable_members", [])
-                                            
-                                            # Department header with staff count if available
-                                            header = dept
-                                            if staff_count:
-                                                header += f" ({staff_count} staff)"
-                                            
-                                            st.markdown(f"### {header}")
-                                            if qualifications:
-                                                st.markdown(f"**Qualifications:** {qualifications}")
-                                            
-                                            # List notable faculty members if any
-                                            if notable_members:
-                                                st.markdown("**Notable Faculty Members:**")
-                                                for member in notable_members:
-                                                    if isinstance(member, dict):
-                                                        name = member.get("name", "")
-                                                        position = member.get("position", "")
-                                                        bio = member.get("bio", "")
-                                                        
-                                                        member_text = name
-                                                        if position:
-                                                            member_text += f" - {position}"
-                                                        
-                                                        st.markdown(f"**{member_text}**")
-                                                        if bio:
-                                                            st.markdown(bio)
-                                        else:
-                                            st.markdown(faculty)
-                                else:
-                                    st.markdown(faculty_list)
-                            else:
-                                st.info("No faculty information available")
-                        
-                        # Achievements Tab
-                        with info_tabs[6]:
-                            st.subheader("Achievements & Accreditations")
-                            if result.get("achievements") and result["achievements"] != "No information available":
-                                achievements = result["achievements"]
-                                if isinstance(achievements, list):
-                                    for achievement in achievements:
-                                        if isinstance(achievement, dict):
-                                            achievement_type = achievement.get("type", "")
-                                            achievement_name = achievement.get("name", "")
-                                            achievement_year = achievement.get("year", "")
-                                            achievement_desc = achievement.get("description", "")
-                                            achievement_issuer = achievement.get("issuing_body", "")
-                                            
-                                            # Create header with name and year if available
-                                            header = achievement_name
-                                            if achievement_year:
-                                                header += f" ({achievement_year})"
-                                            
-                                            st.markdown(f"**{header}**")
-                                            if achievement_type:
-                                                st.markdown(f"*Type:* {achievement_type}")
-                                            if achievement_issuer:
-                                                st.markdown(f"*Issuing Body:* {achievement_issuer}")
-                                            if achievement_desc:
-                                                st.markdown(achievement_desc)
-                                        else:
-                                            st.markdown(f"- {achievement}")
-                                else:
-                                    st.markdown(achievements)
-                            else:
-                                st.info("No achievement information available")
-                        
-                        # Technical & Marketing Tab
-                        with info_tabs[7]:
-                            col1, col2 = st.columns(2)
-                            
-                            # Technical Data column
-                            with col1:
-                                st.subheader("Technical Infrastructure")
-                                if result.get("technical_data") and result["technical_data"] != "No information available":
-                                    tech_data = result["technical_data"]
-                                    if isinstance(tech_data, dict):
-                                        tech_infra = tech_data.get("technology_infrastructure", "")
-                                        digital_platforms = tech_data.get("digital_platforms", [])
-                                        lms = tech_data.get("learning_management_system", "")
-                                        tech_initiatives = tech_data.get("tech_initiatives", [])
-                                        
-                                        if tech_infra:
-                                            st.markdown(f"**Infrastructure:** {tech_infra}")
-                                        
-                                        if lms:
-                                            st.markdown(f"**Learning Management System:** {lms}")
-                                        
-                                        if digital_platforms:
-                                            st.markdown("**Digital Platforms:**")
-                                            for platform in digital_platforms:
-                                                st.markdown(f"- {platform}")
-                                        
-                                        if tech_initiatives:
-                                            st.markdown("**Tech Initiatives:**")
-                                            for initiative in tech_initiatives:
-                                                st.markdown(f"- {initiative}")
-                                    else:
-                                        st.markdown(tech_data)
-                                else:
-                                    st.info("No technical data available")
-                            
-                            # Marketing column
-                            with col2:
-                                st.subheader("Marketing & Branding")
-                                if result.get("marketing_content") and result["marketing_content"] != "No information available":
-                                    marketing = result["marketing_content"]
-                                    if isinstance(marketing, dict):
-                                        taglines = marketing.get("taglines", [])
-                                        values = marketing.get("value_propositions", [])
-                                        key_messaging = marketing.get("key_messaging", [])
-                                        strategy = marketing.get("content_strategy", "")
-                                        
-                                        if taglines:
-                                            st.markdown("**Taglines:**")
-                                            for tagline in taglines:
-                                                st.markdown(f"- {tagline}")
-                                        
-                                        if values:
-                                            st.markdown("**Value Propositions:**")
-                                            for value in values:
-                                                st.markdown(f"- {value}")
-                                        
-                                        if key_messaging:
-                                            st.markdown("**Key Messaging:**")
-                                            for message in key_messaging:
-                                                st.markdown(f"- {message}")
-                                        
-                                        if strategy:
-                                            st.markdown(f"**Content Strategy:** {strategy}")
-                                    else:
-                                        st.markdown(marketing)
-                                else:
-                                    st.info("No marketing information available")
-                        
-                        # Student Life Tab
-                        with info_tabs[8]:
-                            st.subheader("Student Life")
-                            if result.get("student_life") and result["student_life"] != "No information available":
-                                student_life = result["student_life"]
-                                if isinstance(student_life, dict):
-                                    clubs = student_life.get("clubs_organizations", [])
-                                    testimonials = student_life.get("testimonials", [])
-                                    partnerships = student_life.get("partnerships", [])
-                                    activities = student_life.get("activities", [])
-                                    campus_life = student_life.get("campus_life", "")
-                                    
-                                    if campus_life:
-                                        st.markdown(f"**Campus Life Overview:** {campus_life}")
-                                    
-                                    # Create columns for better organization
-                                    col1, col2 = st.columns(2)
-                                    
-                                    with col1:
-                                        if clubs:
-                                            st.markdown("### Clubs & Organizations")
-                                            for club in clubs:
-                                                if isinstance(club, dict):
-                                                    club_name = club.get("name", "")
-                                                    club_desc = club.get("description", "")
-                                                    
-                                                    st.markdown(f"**{club_name}**")
-                                                    if club_desc:
-                                                        st.markdown(club_desc)
-                                                else:
-                                                    st.markdown(f"- {club}")
-                                        
-                                        if activities:
-                                            st.markdown("### Activities")
-                                            for activity in activities:
-                                                st.markdown(f"- {activity}")
-                                    
-                                    with col2:
-                                        if testimonials:
-                                            st.markdown("### Testimonials")
-                                            for testimonial in testimonials:
-                                                if isinstance(testimonial, dict):
-                                                    quote = testimonial.get("quote", "")
-                                                    source = testimonial.get("source", "")
-                                                    
-                                                    st.markdown(f"*\"{quote}\"*")
-                                                    if source:
-                                                        st.markdown(f"— {source}")
-                                                else:
-                                                    st.markdown(testimonial)
-                                        
-                                        if partnerships:
-                                            st.markdown("### Partnerships")
-                                            for partnership in partnerships:
-                                                if isinstance(partnership, dict):
-                                                    partner = partnership.get("partner", "")
-                                                    nature = partnership.get("nature", "")
-                                                    
-                                                    st.markdown(f"**{partner}**")
-                                                    if nature:
-                                                        st.markdown(f"*Nature:* {nature}")
-                                                else:
-                                                    st.markdown(f"- {partnership}")
-                                else:
-                                    st.markdown(student_life)
-                            else:
-                                st.info("No student life information available")
-                        
-                        # Contact & Raw Data Tab
-                        with info_tabs[9]:
-                            col1, col2 = st.columns(2)
-                            
-                            # Contact info column
-                            with col1:
-                                st.subheader("Contact Information")
-                                if result.get("contact") and result["contact"] != "No information available":
-                                    contact_data = result["contact"]
-                                    if isinstance(contact_data, dict):
-                                        if "address" in contact_data and contact_data["address"]:
-                                            st.markdown(f"**Address:** {contact_data['address']}")
-                                        
-                                        if "phone_numbers" in contact_data and contact_data["phone_numbers"]:
-                                            st.markdown("**Phone Numbers:**")
-                                            for phone in contact_data["phone_numbers"]:
-                                                st.markdown(f"- {phone}")
-                                        
-                                        if "email" in contact_data and contact_data["email"]:
-                                            st.markdown(f"**Email:** {contact_data['email']}")
-                                        
-                                        if "website" in contact_data and contact_data["website"]:
-                                            st.markdown(f"**Website:** [{contact_data['website']}]({contact_data['website']})")
-                                        
-                                        if "social_media" in contact_data and contact_data["social_media"]:
-                                            st.markdown("**Social Media:**")
-                                            for platform, url in contact_data["social_media"].items():
-                                                st.markdown(f"- {platform.capitalize()}: [{url}]({url})")
-                                    else:
-                                        st.markdown(contact_data)
-                                else:
-                                    st.info("No contact information available")
-                            
-                            # Notes and raw data column
-                            with col2:
-                                # Notes
-                                if result.get("notes") and result["notes"] != "No information available" and "Error" not in result.get("notes", ""):
-                                    st.subheader("Notes")
-                                    st.markdown(result["notes"])
-                                
-                                # Option to download the JSON file
-                                json_data = json.dumps(result, indent=2)
-                                st.download_button(
-                                    label="Download JSON data",
-                                    data=json_data,
-                                    file_name=f"{result['name'].replace(' ', '_')}_data.json",
-                                    mime="application/json"
-                                )
-                                
-                                # Show raw data file path
-                                raw_file_path = RAW_DATA_DIR / f"{result['name'].replace(' ', '_')}_raw.txt"
-                                if raw_file_path.exists():
-                                    st.subheader("Raw Data")
-                                    with open(raw_file_path, "r", encoding="utf-8") as f:
-                                        raw_data = f.read()
-                                    st.text_area("Raw Content (First 2000 chars)", raw_data[:2000], height=200)
-                                    st.text(f"Full raw data saved at: {raw_file_path}")
-                
-                # Comparison View Tab
-                with result_tabs[1]:
-                    if len(all_results) > 1:
-                        st.header("School Comparison")
-                        
-                        # Select fields to compare
-                        comparison_fields = st.multiselect(
-                            "Select fields to compare",
-                            options=["Tuition Info", "Program Info", "Enrollment Info", "Events Info", "Scholarship Info", "Contact Info"],
-                            default=["Tuition Info", "Program Info", "Enrollment Info"]
-                        )
-                        
-                        if comparison_fields:
-                            # Create a DataFrame for comparison
-                            comparison_data = []
-                            
-                            field_mapping = {
-                                "Tuition Info": "school_fee",
-                                "Program Info": "program",
-                                "Enrollment Info": "enrollment_process",
-                                "Events Info": "events",
-                                "Scholarship Info": "discounts_scholarships",
-                                "Contact Info": "contact_info"
-                            }
-                            
-                            for result in all_results:
-                                row = {"School": result["name"]}
-                                
-                                for display_name, field_name in field_mapping.items():
-                                    if display_name in comparison_fields:
-                                        row[display_name] = result.get(field_name) != "No information available"
-                                
-                                comparison_data.append(row)
-                            
-
-                            comparison_df = pd.DataFrame(comparison_data)
-                            st.dataframe(comparison_df, use_container_width=True)
+                        if comparison_fields:
+                            # Rebuilt only when the selected fields or the loaded results change
+                            comparison_df = build_comparison_df(
+                                tuple(comparison_fields),
+                                parsed_signature,
+                                st.session_state.get("results_key"),
+                                all_results
+                            )
+                            st.dataframe(comparison_df, use_container_width=True)
                             
                         else:
                             st.info("Please select at least one field to compare")
@@ -899,23 +1194,7 @@ def main():
         with summary_tabs[0]:
             st.subheader("Comprehensive School Market Analysis")            
             
-            st.markdown("""
-            Generate a comprehensive market analysis that compares all scraped schools together.
-            
-            This analysis will provide:
-            - Market overview of all schools
-            - Comparative tuition analysis across different pricing tiers
-            - Analysis of academic programs and curricula across schools
-            - Campus facilities comparison
-            - Faculty and staff analysis
-            - Achievements and accreditations comparison
-            - Summary of admission requirements and processes
-            - Student life and extracurricular activities
-            - Technology infrastructure comparison
-            - Marketing and positioning analysis
-            - Distinctive features of each school
-            - Recommendations for different types of students/families
-            """)
+            st.markdown(COMPREHENSIVE_SUMMARY_DESCRIPTION)
             
             if not all_results or len(all_results) < 2:
                 st.warning("You need at least two schools with scraped data to generate a comprehensive analysis. Please scrape more schools first.")
@@ -945,22 +1224,7 @@ def main():
         # Individual School Summaries Tab
         with summary_tabs[1]:
             st.subheader("Individual School Summaries")            
-            st.markdown("""
-            Generate an AI summary for an individual school based on its scraped data.
-            
-            Each summary provides a comprehensive overview of:
-            - School philosophy and overview
-            - Academic programs and curriculum
-            - Tuition fees and financial information
-            - Enrollment requirements and process
-            - Campus facilities and infrastructure
-            - Faculty qualifications and notable staff
-            - Achievements, accreditations, and recognitions
-            - Marketing approach and brand positioning
-            - Technology infrastructure and digital learning
-            - Student life, clubs, and campus culture
-            - Unique features and distinctive offerings
-            """)
+            st.markdown(INDIVIDUAL_SUMMARY_DESCRIPTION)
             
             if not all_results:
                 st.info("No schools have been scraped yet. Please scrape schools first to view summaries.")
@@ -968,18 +1232,20 @@ def main():
                 # Select a school to summarize
                 selected_school = st.selectbox(
                     "Select a school to view AI-generated summary",
-                    options=[result["name"] for result in all_results],
+                    options=school_names,
                     key="summary_school_selector"
                 )
                 
                 # Get the selected school data
-                school_data = next((r for r in all_results if r["name"] == selected_school), None)
+                school_data = results_by_name.get(selected_school)
                 
                 if school_data:
                     # Find the raw data file for this school
-                    raw_file_path = RAW_DATA_DIR / f"{selected_school.replace(' ', '_')}_raw.txt"
+                    raw_file_path = RAW_DATA_DIR / f"{school_slug(selected_school)}_raw.txt"
+                    # One stat both checks the file exists and keys the cached read
+                    raw_mtime_ns = get_mtime_ns(raw_file_path)
                     
-                    if raw_file_path.exists():
+                    if raw_mtime_ns is not None:
                         # Add a button to explicitly trigger the summarization
                         summary_col1, summary_col2 = st.columns([3, 1])
                         with summary_col2:
@@ -988,6 +1254,9 @@ def main():
                         # Add a placeholder for the summary
                         summary_placeholder = st.empty()
                         
+                        # Regenerate clicks per school, so Summarize shows the latest regenerated summary
+                        summary_regenerations = st.session_state.setdefault("summary_regenerations", {})
+                        
                         # Show file info
                         with summary_col1:
                             st.info(f"Raw data file ready for {selected_school}. Click the 'Summarize Data' button to generate an AI summary.")
@@ -995,12 +1264,15 @@ def main():
                         # Generate summary when button is clicked
                         if summarize_button:
                             with st.spinner(f"Generating AI summary for {selected_school}..."):
-                                # Read the raw data file
-                                with open(raw_file_path, "r", encoding="utf-8") as f:
-                                    raw_data = f.read()
+                                # Read only the part of the raw data file the summary uses
+                                raw_data = read_raw_preview(raw_file_path, raw_mtime_ns, length=SUMMARY_RAW_READ_CHARS)
                                 
                                 # Generate AI summary
-                                summary = summarize_school_data_with_ai(raw_data, selected_school)
+                                summary = summarize_school_data_with_ai(
+                                    raw_data,
+                                    selected_school,
+                                    summary_regenerations.get(selected_school, 0)
+                                )
                                 
                                 # Display the summary
                                 summary_placeholder.markdown(summary)
@@ -1008,11 +1280,17 @@ def main():
                         # Add option to regenerate the summary
                         if st.button("🔄 Regenerate Summary", key="regenerate_summary"):
                             with st.spinner("Regenerating summary..."):
-                                # Read the raw data file
-                                with open(raw_file_path, "r", encoding="utf-8") as f:
-                                    raw_data = f.read()
-                                    
-                                summary = summarize_school_data_with_ai(raw_data, selected_school)
+                                # Read only the part of the raw data file the summary uses
+                                raw_data = read_raw_preview(raw_file_path, raw_mtime_ns, length=SUMMARY_RAW_READ_CHARS)
+                                
+                                # A new regeneration number asks Gemini again for this school only,
+                                # leaving the other schools' cached summaries in place
+                                summary_regenerations[selected_school] = summary_regenerations.get(selected_school, 0) + 1
+                                summary = summarize_school_data_with_ai(
+                                    raw_data,
+                                    selected_school,
+                                    summary_regenerations[selected_school]
+                                )
                                 summary_placeholder.markdown(summary)
                     else:
                         st.warning(f"Raw data file not found for {selected_school}. Please ensure the school has been scraped completely.")
@@ -1032,9 +1310,10 @@ def main():
         
         # Auto-generate Excel data on tab load
         with st.spinner("Preparing Excel export..."):
-            excel_data = export_results_to_excel(all_results)
-            if excel_data:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            excel_export = get_export_excel(parsed_signature, st.session_state.get("results_key"), all_results)
+            if excel_export:
+                excel_data, exported_at = excel_export
+                timestamp = exported_at.strftime("%Y%m%d_%H%M%S")
                 st.download_button(
                     label="📥 Download Excel Report (All Schools)",
                     data=excel_data,
@@ -1051,7 +1330,7 @@ def main():
         
         # Create a combined JSON containing all school data
         if all_results:
-            combined_json = json.dumps(all_results, indent=2)
+            combined_json = get_export_combined_json(parsed_signature, st.session_state.get("results_key"), all_results)
             st.download_button(
                 label="📥 Download All Schools as Combined JSON",
                 data=combined_json,
@@ -1059,38 +1338,52 @@ def main():
                 mime="application/json",
                 key="download_combined_json"
             )
+            st.download_button(
+                label="📥 Download All Schools as Compressed JSON (.json.gz)",
+                data=get_export_combined_json_gz(parsed_signature, st.session_state.get("results_key"), all_results),
+                file_name=f"all_schools_combined_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json.gz",
+                mime="application/gzip",
+                key="download_combined_json_gz"
+            )
             
             # Individual school downloads
             with st.expander("Individual School Data Downloads"):
-                st.info("Expand to see download options for individual schools")
-                for result in all_results:
-                    school_name = result["name"]
-                    json_data = json.dumps(result, indent=2)
-                    
-                    st.markdown(f"### {school_name}")
-                    col1, col2 = st.columns(2)
-                    
-                    # Parsed data download
-                    with col1:
+                # Only the selected school's files are serialized/read on each rerun
+                download_school = st.selectbox(
+                    "Select a school to download its data",
+                    options=school_names,
+                    key="download_school_selector"
+                )
+                result = results_by_name[download_school]
+                school_name = result["name"]
+                json_data = get_result_json(school_name, parsed_signature, st.session_state.get("results_key"), result)
+                
+                st.markdown(f"### {school_name}")
+                col1, col2 = st.columns(2)
+                slug = school_slug(school_name)
+                
+                # Parsed data download
+                with col1:
+                    st.download_button(
+                        label=f"Download Parsed Data",
+                        data=json_data,
+                        file_name=f"{slug}_data.json",
+                        mime="application/json",
+                        key=f"download_parsed_{school_name}"
+                    )
+                
+                # Raw data download
+                raw_file_path = RAW_DATA_DIR / f"{slug}_raw.txt"
+                raw_mtime_ns = get_mtime_ns(raw_file_path)
+                if raw_mtime_ns is not None:
+                    with col2:
                         st.download_button(
-                            label=f"Download Parsed Data",
-                            data=json_data,
-                            file_name=f"{school_name.replace(' ', '_')}_data.json",
+                            label=f"Download Raw Data",
+                            data=read_raw_bytes(raw_file_path, raw_mtime_ns),
+                            file_name=f"{slug}_raw_data.json",
                             mime="application/json",
-                            key=f"download_parsed_{school_name}"
+                            key=f"download_raw_{school_name}"
                         )
-                    
-                    # Raw data download
-                    raw_file_path = RAW_DATA_DIR / f"{school_name.replace(' ', '_')}_raw.txt"
-                    if raw_file_path.exists():
-                        with col2:
-                            st.download_button(
-                                label=f"Download Raw Data",
-                                data=open(raw_file_path, "r", encoding="utf-8").read(),
-                                file_name=f"{school_name.replace(' ', '_')}_raw_data.json",
-                                mime="application/json",
-                                key=f"download_raw_{school_name}"
-                            )
         else:
             st.info("No data available to export. Please scrape schools first in the 'Scrape Schools' tab.")
     
@@ -1122,15 +1415,41 @@ def main():
         """)
     
 
+# Currency amount in free text such as "PHP 250,000" or "$1,200.50"
+FEE_AMOUNT_PATTERN = re.compile(r'(?:[$₱]|PHP)[,\s]*([0-9,]+(?:\.[0-9]+)?)')
+CURRENCY_STRIP_TABLE = str.maketrans("", "", ",$₱")
+
+# Fee fields in tuition_by_level entries and their column labels
+FEE_FIELDS = (
+    ("annual", "Annual Fee"),
+    ("semester1", "Semester 1 Fee"),
+    ("semester2", "Semester 2 Fee"),
+)
+
+
+def parse_fee_amount(value):
+    """Convert a fee string such as "PHP 250,000" to a float, or return it unchanged"""
+    try:
+        return float(value.translate(CURRENCY_STRIP_TABLE).replace("PHP", "").strip())
+    except (ValueError, AttributeError):
+        return value
+
+
 def extract_tuition_fees(school_data):
-    """Extract tuition fee information from school data for analytics."""
+    """Extract tuition fee rows from school data for analytics.
+    
+    Returns one row per tuition level with structured fees, plus a "General"
+    row holding the academic year and any fees given as plain text.
+    """
     try:
         fee_data = school_data.get("school_fee", {})
-        if isinstance(fee_data, str) or fee_data == "No information available":
-            return {}
+        if isinstance(fee_data, str) or fee_data == NO_INFORMATION:
+            return []
             
         school_name = school_data.get("name", "Unknown School")
         result = {"School": school_name, "Program/Grade Level": "General"}
+        level_rows = []
+        has_general_fees = False
         
         # Extract academic year
         if isinstance(fee_data, dict) and "academic_year" in fee_data:
@@ -1148,34 +1467,14 @@ def extract_tuition_fees(school_data):
                         level_row["Academic Year"] = result["Academic Year"]
                     
                     # Look for annual fee, semester fees, or description
-                    if "annual" in details:
-                        try:
-                            # Try to convert to numeric
-                            amount_str = details["annual"].replace(",", "").replace("$", "").replace("₱", "").replace("PHP", "").strip()
-                            level_row["Annual Fee"] = float(amount_str)
-                        except (ValueError, AttributeError):
-                            level_row["Annual Fee"] = details["annual"]
-                    
-                    if "semester1" in details:
-                        try:
-                            # Try to convert to numeric
-                            amount_str = details["semester1"].replace(",", "").replace("$", "").replace("₱", "").replace("PHP", "").strip()
-                            level_row["Semester 1 Fee"] = float(amount_str)
-                        except (ValueError, AttributeError):
-                            level_row["Semester 1 Fee"] = details["semester1"]
-                    
-                    if "semester2" in details:
-                        try:
-                            # Try to convert to numeric
-                            amount_str = details["semester2"].replace(",", "").replace("$", "").replace("₱", "").replace("PHP", "").strip()
-                            level_row["Semester 2 Fee"] = float(amount_str)
-                        except (ValueError, AttributeError):
-                            level_row["Semester 2 Fee"] = details["semester2"]
+                    for field, label in FEE_FIELDS:
+                        if field in details:
+                            level_row[label] = parse_fee_amount(details[field])
                     
                     if "description" in details:
                         # Try to extract numeric values from description
                         desc = details["description"]
-                        amount_match = re.search(r'(?:[$₱]|PHP)[,\s]*([0-9,]+(?:\.[0-9]+)?)', desc)
+                        amount_match = FEE_AMOUNT_PATTERN.search(desc)
                         if amount_match:
                             # Clean up the amount and convert to numeric
                             amount_str = amount_match.group(1).replace(',', '')
@@ -1185,11 +1484,12 @@ def extract_tuition_fees(school_data):
                                 pass
                         level_row["Description"] = desc
                     
-                    return level_row  # Return one row per call for simplicity
+                    level_rows.append(level_row)
                     
                 elif isinstance(details, str):
+                    has_general_fees = True
                     # Try to extract numeric values from the string
-                    amount_match = re.search(r'(?:[$₱]|PHP)[,\s]*([0-9,]+(?:\.[0-9]+)?)', details)
+                    amount_match = FEE_AMOUNT_PATTERN.search(details)
                     if amount_match:
                         # Clean up the amount and convert to numeric
                         amount_str = amount_match.group(1).replace(',', '')
@@ -1199,60 +1499,161 @@ def extract_tuition_fees(school_data):
                             result[f"{level} Fee"] = details
                     else:
                         result[f"{level}"] = details
-            
-        return result
+        
+        # Keep the general row when it carries fees of its own or is all we have
+        if has_general_fees or not level_rows:
+            level_rows.insert(0, result)
+        return level_rows
     except Exception as e:
         logger.error(f"Error extracting tuition data: {e}")
-        return {"School": school_data.get("name", "Unknown School"), "Error": str(e)}
+        return [{"School": school_data.get("name", "Unknown School"), "Error": str(e)}]
+
+
+# Templates for the AI summary prompts; see get_prompt
+SCHOOL_SUMMARY_TEMPLATE = (
+    """You are an educational consultant tasked with summarizing information about {school_name}. 
+    Please provide a comprehensive, informative summary of the school based on the following raw data.
+    
+    Focus on these key aspects in detail:
+    1. School overview and educational philosophy
+    2. Academic programs and curriculum offerings
+    3. Tuition fees and financial information
+    4. Enrollment requirements and process
+    5. Campus facilities and infrastructure
+    6. Faculty qualifications and notable staff
+    7. School achievements, accreditations, and recognitions
+    8. Marketing approach and brand positioning
+    9. Technology infrastructure and digital learning platforms
+    10. Student life, extracurricular activities, and campus culture
+    11. What makes this school unique or distinctive compared to other international schools
+    
+    Format your response with clear sections, bullet points, and tables where appropriate.
+    Make your analysis data-driven and evidence-based, citing specific information from the raw data.
+    Maintain a professional, informative tone throughout.
+    
+    Raw data:
+    {raw_content}
+    """
+)
+
+COMBINED_SUMMARY_TEMPLATE = (
+    """You are an educational consultant tasked with creating a comprehensive market overview of international schools 
+    based on the data provided. This data comes from multiple schools that have been scraped and analyzed.
+    
+    Create an informative, well-structured summary that thoroughly covers:
+    
+    1. MARKET OVERVIEW: General trends and observations across all schools, educational approaches, and positioning
+    
+    2. TUITION AND FEES: Compare tuition ranges and fee structures across different schools, identifying pricing tiers and what differentiates schools in different price brackets
+    
+    3. ACADEMIC PROGRAMS: Common programs, curricula, and educational philosophies, as well as unique or specialized offerings that make certain schools stand out
+    
+    4. CAMPUS FACILITIES: Compare school infrastructure, learning spaces, laboratories, libraries, sports facilities, and other amenities
+    
+    5. FACULTY ANALYSIS: Analyze teaching staff credentials, department structures, student-teacher ratios, and notable faculty members
+    
+    6. ACHIEVEMENTS & RECOGNITION: Compare accreditations, awards, academic achievements, and recognitions across schools
+    
+    7. ADMISSIONS LANDSCAPE: Summarize typical admission requirements, processes, and relative selectivity of different schools
+    
+    8. STUDENT LIFE: Compare extracurricular offerings, clubs, activities, campus culture, and student testimonials
+    
+    9. TECHNOLOGY INFRASTRUCTURE: Analyze digital learning platforms, technology integration, and innovation across schools
+    
+    10. MARKETING APPROACHES: Compare how schools position themselves, their key messaging, value propositions, and target audience
+    
+    11. COMPARATIVE STRENGTHS: For each school, identify its distinctive features, competitive advantages, and unique selling points
+    
+    12. RECOMMENDATIONS: Provide specific recommendations for different types of students/families based on their priorities, including academic needs, budget considerations, and extracurricular interests
+    
+    Format your response with clear section headers, bullet points, tables, and comparison matrices where appropriate.
+    Maintain a professional, objective tone throughout. Base all analysis on the provided data, not general knowledge.
+    Make specific school-to-school comparisons where possible.
+    
+    Here is the combined data from all scraped schools:
+    
+    {data_chunk}
+    """
+)
+
+SUMMARY_INTEGRATION_TEMPLATE = (
+    """You are an educational consultant creating a final, integrated report on international schools.
+    You have processed multiple data chunks and now need to integrate the separate summaries into 
+    a single coherent report.
+    
+    The summaries may contain some redundant information. Your task is to:
+    1. Remove redundancies
+    2. Resolve any contradictions
+    3. Create a unified, well-structured report
+    4. Ensure all schools mentioned are included
+    5. Maintain the comprehensive section structure including:
+       - Market Overview
+       - Tuition Analysis
+       - Academic Programs
+       - Campus Facilities
+       - Faculty Analysis
+       - Achievements & Recognition
+       - Admissions Landscape
+       - Student Life
+       - Technology Infrastructure
+       - Marketing Approaches
+       - Comparative Strengths
+       - Recommendations
+    
+    Here are the separate summaries to integrate:
+    
+    {summaries}
+    """
+)
+
+
+@st.cache_resource
+def get_prompt(template):
+    """Build a chat prompt from a template once; langchain_core is imported on first use"""
+    from langchain_core.prompts import ChatPromptTemplate
+    
+    return ChatPromptTemplate.from_template(template)
 
-def summarize_school_data_with_ai(raw_data, school_name):
+
+def summarize_school_data_with_ai(raw_data, school_name, regeneration=0):
     """Generate an AI summary of the school data."""
     try:
-        # Initialize the AI model
-        model = ChatGoogleGenerativeAI(model="gemini-1.5-flash-latest", temperature=0)
-          # Create a prompt for summarizing the school data
-        summary_prompt = ChatPromptTemplate.from_template(
-            """You are an educational consultant tasked with summarizing information about {school_name}. 
-            Please provide a comprehensive, informative summary of the school based on the following raw data.
-            
-            Focus on these key aspects in detail:
-            1. School overview and educational philosophy
-            2. Academic programs and curriculum offerings
-            3. Tuition fees and financial information
-            4. Enrollment requirements and process
-            5. Campus facilities and infrastructure
-            6. Faculty qualifications and notable staff
-            7. School achievements, accreditations, and recognitions
-            8. Marketing approach and brand positioning
-            9. Technology infrastructure and digital learning platforms
-            10. Student life, extracurricular activities, and campus culture
-            11. What makes this school unique or distinctive compared to other international schools
-            
-            Format your response with clear sections, bullet points, and tables where appropriate.
-            Make your analysis data-driven and evidence-based, citing specific information from the raw data.
-            Maintain a professional, informative tone throughout.
-            
-            Raw data:
-            {raw_content}
-            """
-        )
-        
-        # Create the chain
-        chain = summary_prompt | model
-        
-        # Generate the summary
-        response = chain.invoke(
-            {"school_name": school_name, "raw_content": raw_data[:15000]}  # Limit content length
-        )
-        
-        # Extract the content
-        return response.content if hasattr(response, 'content') else str(response)
-        
+        return cached_school_summary(raw_data, school_name, regeneration)
     except Exception as e:
         logger.error(f"Error generating AI summary for {school_name}: {e}")
         return f"Unable to generate summary for {school_name}: {str(e)}"
 
+@st.cache_data(show_spinner=False, ttl=3600)
+def cached_school_summary(raw_data, school_name, regeneration=0):
+    """Call Gemini for a school summary; failures raise so they are not cached.
+    
+    regeneration counts the school's "Regenerate Summary" clicks. Each new value is
+    a new cache entry and skips the on-disk LLM cache, so only that school is refreshed.
+    """
+    # Reuse the shared AI model
+    model = get_llm(use_llm_cache=regeneration == 0)
+    
+    # Create the chain
+    chain = get_prompt(SCHOOL_SUMMARY_TEMPLATE) | model
+    
+    # Generate the summary
+    response = chain.invoke(
+        {"school_name": school_name, "raw_content": compact_raw_text(raw_data)[:MAX_SUMMARY_RAW_CHARS]}  # Limit content length
+    )
+    
+    # Extract the content
+    return response.content if hasattr(response, 'content') else str(response)
+
 def generate_combined_school_summary(all_results):
+    """Generate a comprehensive summary of all scraped schools (cached per result set)."""
+    try:
+        return cached_combined_summary(all_results)
+    except Exception as e:
+        logger.error(f"Error generating combined school summary: {e}")
+        return f"Unable to generate comprehensive summary: {str(e)}"
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def cached_combined_summary(all_results):
     """Generate a comprehensive summary of all scraped schools.
     
     This function:
@@ -1265,279 +1666,405 @@ def generate_combined_school_summary(all_results):
         
     Returns:
         String containing the comprehensive AI-generated summary
+
+    Raises if any chunk or the integration step fails, so errors are never cached.
     """
-    try:
-        # Initialize the AI model with a higher token capacity model
-        model = ChatGoogleGenerativeAI(model="gemini-1.5-flash-latest", temperature=0)
-        
-        # Import the comprehensive analysis template from parse.py
-        from lib.parse import comprehensive_analysis_template
+    # Reuse the shared AI model
+    model = get_llm()
+    
+    # Import the comprehensive analysis template from parse.py
+    from lib.parse import comprehensive_analysis_template
+    
+    # Collect raw data for all schools
+    all_schools_data = []
+    for result in all_results:
+        school_name = result["name"]
+        raw_file_path = RAW_DATA_DIR / f"{school_slug(school_name)}_raw.txt"
         
-        # Collect raw data for all schools
-        all_schools_data = []
-        for result in all_results:
-            school_name = result["name"]
-            raw_file_path = RAW_DATA_DIR / f"{school_name.replace(' ', '_')}_raw.txt"
-            
-            if raw_file_path.exists():
-                # Read just the essential information from each school's raw data
-                try:
-                    with open(raw_file_path, "r", encoding="utf-8") as f:
-                        raw_content = f.read()
-                    
-                    # Extract key information with a limit of 3000 chars per school to avoid token limits
-                    school_excerpt = f"\n\n===== SCHOOL: {school_name} =====\n"
-                    
-                    # Add a summary of structured data from the parsed result
-                    school_excerpt += f"WEBSITE: {result.get('link', 'Not available')}\n\n"
-                    
-                    # Add tuition info
-                    fee_data = result.get("school_fee", {})
-                    if isinstance(fee_data, dict) and "academic_year" in fee_data:
-                        school_excerpt += f"TUITION: Academic Year {fee_data.get('academic_year', '')}\n"
-                        if "tuition_by_level" in fee_data and isinstance(fee_data["tuition_by_level"], dict):
-                            school_excerpt += "TUITION LEVELS:\n"
-                            for level, details in fee_data["tuition_by_level"].items():
-                                if isinstance(details, dict):
-                                    school_excerpt += f"- {level}: "
-                                    if "annual" in details:
-                                        school_excerpt += f"Annual: {details['annual']} "
-                                    if "description" in details:
-                                        desc = details["description"]
-                                        if len(desc) > 100:
-                                            desc = desc[:100] + "..."
-                                        school_excerpt += f"{desc}\n"
-                                    else:
-                                        school_excerpt += "\n"
+        if raw_file_path.exists():
+            # Read just the essential information from each school's raw data
+            try:
+                # Extract key information with a limit of 3000 chars per school to avoid token limits
+                excerpt_parts = [f"\n\n===== SCHOOL: {school_name} =====\n"]
+                
+                # Add a summary of structured data from the parsed result
+                excerpt_parts.append(f"WEBSITE: {result.get('link', 'Not available')}\n\n")
+                
+                # Add tuition info
+                fee_data = result.get("school_fee", {})
+                if isinstance(fee_data, dict) and "academic_year" in fee_data:
+                    excerpt_parts.append(f"TUITION: Academic Year {fee_data.get('academic_year', '')}\n")
+                    if "tuition_by_level" in fee_data and isinstance(fee_data["tuition_by_level"], dict):
+                        excerpt_parts.append("TUITION LEVELS:\n")
+                        for level, details in fee_data["tuition_by_level"].items():
+                            if isinstance(details, dict):
+                                excerpt_parts.append(f"- {level}: ")
+                                if "annual" in details:
+                                    excerpt_parts.append(f"Annual: {details['annual']} ")
+                                if "description" in details:
+                                    desc = details["description"]
+                                    if len(desc) > 100:
+                                        desc = desc[:100] + "..."
+                                    excerpt_parts.append(f"{desc}\n")
                                 else:
-                                    school_excerpt += f"- {level}: {details}\n"
-                        
-                    # Add program highlights
-                    programs = result.get("programs", [])
-                    if isinstance(programs, list) and len(programs) > 0:
-                        school_excerpt += "PROGRAMS:\n"
-                        for p in programs[:5]:
-                            if isinstance(p, dict):
-                                name = p.get("name", "")
-                                grade = p.get("grade_level", "")
-                                school_excerpt += f"- {name} ({grade})\n"
-                    
-                    # Add enrollment info
-                    enrollment = result.get("enrollment", {})
-                    if isinstance(enrollment, dict) and not isinstance(enrollment, str):
-                        school_excerpt += "ENROLLMENT:\n"
-                        if "requirements" in enrollment and enrollment["requirements"]:
-                            school_excerpt += "Requirements: " + ", ".join(enrollment["requirements"][:3])
-                            if len(enrollment["requirements"]) > 3:
-                                school_excerpt += "..."
-                            school_excerpt += "\n"
-                      # Add scholarship info
-                    scholarships = result.get("scholarships", [])
-                    if isinstance(scholarships, list) and len(scholarships) > 0 and not isinstance(scholarships, str):
-                        school_excerpt += "SCHOLARSHIPS: Available\n"
-                    
-                    # Add facilities information
-                    facilities = result.get("facilities", [])
-                    if isinstance(facilities, list) and len(facilities) > 0 and not isinstance(facilities, str):
-                        school_excerpt += "FACILITIES:\n"
-                        for facility in facilities[:3]:  # Limit to first 3 to save space
-                            if isinstance(facility, dict):
-                                facility_name = facility.get("name", "")
-                                facility_type = facility.get("type", "")
-                                if facility_name:
-                                    if facility_type:
-                                        school_excerpt += f"- {facility_name} ({facility_type})\n"
-                                    else:
-                                        school_excerpt += f"- {facility_name}\n"
-                    
-                    # Add faculty information
-                    faculty = result.get("faculty", [])
-                    if isinstance(faculty, list) and len(faculty) > 0 and not isinstance(faculty, str):
-                        school_excerpt += "FACULTY:\n"
-                        for dept in faculty[:2]:  # Limit to first 2 departments
-                            if isinstance(dept, dict):
-                                dept_name = dept.get("department", "")
-                                staff_count = dept.get("staff_count", "")
-                                if dept_name:
-                                    if staff_count:
-                                        school_excerpt += f"- {dept_name} ({staff_count} staff)\n"
-                                    else:
-                                        school_excerpt += f"- {dept_name}\n"
-                    
-                    # Add achievements information
-                    achievements = result.get("achievements", [])
-                    if isinstance(achievements, list) and len(achievements) > 0 and not isinstance(achievements, str):
-                        school_excerpt += "ACHIEVEMENTS:\n"
-                        for achievement in achievements[:2]:  # Limit to first 2 achievements
-                            if isinstance(achievement, dict):
-                                achievement_name = achievement.get("name", "")
-                                achievement_year = achievement.get("year", "")
-                                if achievement_name:
-                                    if achievement_year:
-                                        school_excerpt += f"- {achievement_name} ({achievement_year})\n"
-                                    else:
-                                        school_excerpt += f"- {achievement_name}\n"
-                    
-                    # Add student life information
-                    student_life = result.get("student_life", {})
-                    if isinstance(student_life, dict) and not isinstance(student_life, str):
-                        if student_life.get("campus_life") or student_life.get("clubs_organizations"):
-                            school_excerpt += "STUDENT LIFE:\n"
-                            if student_life.get("campus_life"):
-                                excerpt = student_life.get("campus_life")[:100]  # Limit length
-                                if len(student_life.get("campus_life")) > 100:
-                                    excerpt += "..."
-                                school_excerpt += f"Campus Culture: {excerpt}\n"
-                            if isinstance(student_life.get("clubs_organizations"), list) and len(student_life.get("clubs_organizations")) > 0:
-                                school_excerpt += f"Clubs: {len(student_life.get('clubs_organizations'))} organizations\n"
-                    
-                    # Add marketing content information
-                    marketing = result.get("marketing_content", {})
-                    if isinstance(marketing, dict) and not isinstance(marketing, str):
-                        if marketing.get("taglines") and isinstance(marketing.get("taglines"), list) and len(marketing.get("taglines")) > 0:
-                            school_excerpt += "MARKETING:\n"
-                            taglines = marketing.get("taglines")[:2]  # Limit to first 2 taglines
-                            for tagline in taglines:
-                                school_excerpt += f"- {tagline}\n"
-                    
-                    # Limit raw content to first ~1000 chars of meaningful data
-                    content_start = raw_content.find("MAIN PAGE CONTENT:")
-                    if content_start > 0:
-                        relevant_content = raw_content[content_start:content_start+1000]
-                        school_excerpt += f"EXCERPT: {relevant_content}...\n"
-                    
-                    all_schools_data.append(school_excerpt)
+                                    excerpt_parts.append("\n")
+                            else:
+                                excerpt_parts.append(f"- {level}: {details}\n")
                     
-                except Exception as e:
-                    logger.error(f"Error processing raw data for {school_name}: {e}")
-                    all_schools_data.append(f"===== SCHOOL: {school_name} =====\nError reading data: {str(e)}")
-            else:
-                all_schools_data.append(f"===== SCHOOL: {school_name} =====\nNo raw data file available.")
-        
-        # Combine all schools data
-        combined_data = "\n\n".join(all_schools_data)
-        
-        # Split into chunks to respect token limits
-        from lib.utils import split_dom_content
-        chunks = split_dom_content(combined_data, max_length=12000)  # Chunk size suitable for gemini-1.5-flash-latest
-          # Create comprehensive summary prompt
-        comprehensive_prompt = ChatPromptTemplate.from_template(
-            """You are an educational consultant tasked with creating a comprehensive market overview of international schools 
-            based on the data provided. This data comes from multiple schools that have been scraped and analyzed.
-            
-            Create an informative, well-structured summary that thoroughly covers:
-            
-            1. MARKET OVERVIEW: General trends and observations across all schools, educational approaches, and positioning
-            
-            2. TUITION AND FEES: Compare tuition ranges and fee structures across different schools, identifying pricing tiers and what differentiates schools in different price brackets
-            
-            3. ACADEMIC PROGRAMS: Common programs, curricula, and educational philosophies, as well as unique or specialized offerings that make certain schools stand out
-            
-            4. CAMPUS FACILITIES: Compare school infrastructure, learning spaces, laboratories, libraries, sports facilities, and other amenities
-            
-            5. FACULTY ANALYSIS: Analyze teaching staff credentials, department structures, student-teacher ratios, and notable faculty members
-            
-            6. ACHIEVEMENTS & RECOGNITION: Compare accreditations, awards, academic achievements, and recognitions across schools
-            
-            7. ADMISSIONS LANDSCAPE: Summarize typical admission requirements, processes, and relative selectivity of different schools
-            
-            8. STUDENT LIFE: Compare extracurricular offerings, clubs, activities, campus culture, and student testimonials
-            
-            9. TECHNOLOGY INFRASTRUCTURE: Analyze digital learning platforms, technology integration, and innovation across schools
-            
-            10. MARKETING APPROACHES: Compare how schools position themselves, their key messaging, value propositions, and target audience
-            
-            11. COMPARATIVE STRENGTHS: For each school, identify its distinctive features, competitive advantages, and unique selling points
-            
-            12. RECOMMENDATIONS: Provide specific recommendations for different types of students/families based on their priorities, including academic needs, budget considerations, and extracurricular interests
-            
-            Format your response with clear section headers, bullet points, tables, and comparison matrices where appropriate.
-            Maintain a professional, objective tone throughout. Base all analysis on the provided data, not general knowledge.
-            Make specific school-to-school comparisons where possible.
-            
-            Here is the combined data from all scraped schools:
-            
-            {data_chunk}
-            """
-        )
-        
-        # Process each chunk and combine results
-        all_summaries = []
-        for i, chunk in enumerate(chunks):
-            try:
-                logger.info(f"Processing chunk {i+1} of {len(chunks)} for combined school summary")
+                # Add program highlights
+                programs = result.get("programs", [])
+                if isinstance(programs, list) and len(programs) > 0:
+                    excerpt_parts.append("PROGRAMS:\n")
+                    for p in programs[:5]:
+                        if isinstance(p, dict):
+                            name = p.get("name", "")
+                            grade = p.get("grade_level", "")
+                            excerpt_parts.append(f"- {name} ({grade})\n")
+                
+                # Add enrollment info
+                enrollment = result.get("enrollment", {})
+                if isinstance(enrollment, dict) and not isinstance(enrollment, str):
+                    excerpt_parts.append("ENROLLMENT:\n")
+                    if "requirements" in enrollment and enrollment["requirements"]:
+                        excerpt_parts.append("Requirements: " + ", ".join(enrollment["requirements"][:3]))
+                        if len(enrollment["requirements"]) > 3:
+                            excerpt_parts.append("...")
+                        excerpt_parts.append("\n")
+                  # Add scholarship info
+                scholarships = result.get("scholarships", [])
+                if isinstance(scholarships, list) and len(scholarships) > 0 and not isinstance(scholarships, str):
+                    excerpt_parts.append("SCHOLARSHIPS: Available\n")
                 
-                # Create the chain
-                chain = comprehensive_prompt | model
+                # Add facilities information
+                facilities = result.get("facilities", [])
+                if isinstance(facilities, list) and len(facilities) > 0 and not isinstance(facilities, str):
+                    excerpt_parts.append("FACILITIES:\n")
+                    for facility in facilities[:3]:  # Limit to first 3 to save space
+                        if isinstance(facility, dict):
+                            facility_name = facility.get("name", "")
+                            facility_type = facility.get("type", "")
+                            if facility_name:
+                                if facility_type:
+                                    excerpt_parts.append(f"- {facility_name} ({facility_type})\n")
+                                else:
+                                    excerpt_parts.append(f"- {facility_name}\n")
                 
-                # Generate the summary for this chunk
-                response = chain.invoke({"data_chunk": chunk})
+                # Add faculty information
+                faculty = result.get("faculty", [])
+                if isinstance(faculty, list) and len(faculty) > 0 and not isinstance(faculty, str):
+                    excerpt_parts.append("FACULTY:\n")
+                    for dept in faculty[:2]:  # Limit to first 2 departments
+                        if isinstance(dept, dict):
+                            dept_name = dept.get("department", "")
+                            staff_count = dept.get("staff_count", "")
+                            if dept_name:
+                                if staff_count:
+                                    excerpt_parts.append(f"- {dept_name} ({staff_count} staff)\n")
+                                else:
+                                    excerpt_parts.append(f"- {dept_name}\n")
                 
-                # Extract the content
-                chunk_summary = response.content if hasattr(response, 'content') else str(response)
-                all_summaries.append(chunk_summary)
+                # Add achievements information
+                achievements = result.get("achievements", [])
+                if isinstance(achievements, list) and len(achievements) > 0 and not isinstance(achievements, str):
+                    excerpt_parts.append("ACHIEVEMENTS:\n")
+                    for achievement in achievements[:2]:  # Limit to first 2 achievements
+                        if isinstance(achievement, dict):
+                            achievement_name = achievement.get("name", "")
+                            achievement_year = achievement.get("year", "")
+                            if achievement_name:
+                                if achievement_year:
+                                    excerpt_parts.append(f"- {achievement_name} ({achievement_year})\n")
+                                else:
+                                    excerpt_parts.append(f"- {achievement_name}\n")
                 
-            except Exception as e:
-                logger.error(f"Error generating summary for chunk {i+1}: {e}")
-                all_summaries.append(f"Error processing data chunk {i+1}: {str(e)}")
-        
-        # Combine chunk summaries and add final integration if multiple chunks
-        final_summary = "\n\n".join(all_summaries)
-        
-        # If we had multiple chunks, do a final integration pass
-        if len(chunks) > 1:
-            try:                
-                integration_prompt = ChatPromptTemplate.from_template(
-                    """You are an educational consultant creating a final, integrated report on international schools.
-                    You have processed multiple data chunks and now need to integrate the separate summaries into 
-                    a single coherent report.
-                    
-                    The summaries may contain some redundant information. Your task is to:
-                    1. Remove redundancies
-                    2. Resolve any contradictions
-                    3. Create a unified, well-structured report
-                    4. Ensure all schools mentioned are included
-                    5. Maintain the comprehensive section structure including:
-                       - Market Overview
-                       - Tuition Analysis
-                       - Academic Programs
-                       - Campus Facilities
-                       - Faculty Analysis
-                       - Achievements & Recognition
-                       - Admissions Landscape
-                       - Student Life
-                       - Technology Infrastructure
-                       - Marketing Approaches
-                       - Comparative Strengths
-                       - Recommendations
-                    
-                    Here are the separate summaries to integrate:
-                    
-                    {summaries}
-                    """
-                )
+                # Add student life information
+                student_life = result.get("student_life", {})
+                if isinstance(student_life, dict) and not isinstance(student_life, str):
+                    if student_life.get("campus_life") or student_life.get("clubs_organizations"):
+                        excerpt_parts.append("STUDENT LIFE:\n")
+                        if student_life.get("campus_life"):
+                            excerpt = student_life.get("campus_life")[:100]  # Limit length
+                            if len(student_life.get("campus_life")) > 100:
+                                excerpt += "..."
+                            excerpt_parts.append(f"Campus Culture: {excerpt}\n")
+                        if isinstance(student_life.get("clubs_organizations"), list) and len(student_life.get("clubs_organizations")) > 0:
+                            excerpt_parts.append(f"Clubs: {len(student_life.get('clubs_organizations'))} organizations\n")
                 
-                # Create the integration chain
-                integration_chain = integration_prompt | model
+                # Add marketing content information
+                marketing = result.get("marketing_content", {})
+                if isinstance(marketing, dict) and not isinstance(marketing, str):
+                    if marketing.get("taglines") and isinstance(marketing.get("taglines"), list) and len(marketing.get("taglines")) > 0:
+                        excerpt_parts.append("MARKETING:\n")
+                        taglines = marketing.get("taglines")[:2]  # Limit to first 2 taglines
+                        for tagline in taglines:
+                            excerpt_parts.append(f"- {tagline}\n")
                 
-                # Generate the integrated summary
-                integration_response = integration_chain.invoke({"summaries": final_summary})
+                # Limit raw content to first ~1000 chars of meaningful data
+                relevant_content = read_raw_excerpt(raw_file_path, length=4000)
+                if relevant_content:
+                    relevant_content = compact_raw_text(relevant_content)[:1000]
+                    excerpt_parts.append(f"EXCERPT: {relevant_content}...\n")
                 
-                # Replace with integrated version
-                final_summary = integration_response.content if hasattr(integration_response, 'content') else str(integration_response)
+                all_schools_data.append("".join(excerpt_parts))
                 
             except Exception as e:
-                logger.error(f"Error integrating summaries: {e}")
-                # If integration fails, we still have the combined summaries
+                logger.error(f"Error processing raw data for {school_name}: {e}")
+                all_schools_data.append(f"===== SCHOOL: {school_name} =====\nError reading data: {str(e)}")
+        else:
+            all_schools_data.append(f"===== SCHOOL: {school_name} =====\nNo raw data file available.")
+    
+    # Combine all schools data
+    combined_data = "\n\n".join(all_schools_data)
+    
+    # Split into chunks to respect token limits
+    from lib.utils import split_dom_content
+    chunks = split_dom_content(combined_data, max_length=12000)  # Chunk size suitable for gemini-1.5-flash-latest
+    
+    # Create the chain
+    chain = get_prompt(COMBINED_SUMMARY_TEMPLATE) | model
+    
+    # Summarize all chunks concurrently; failed chunks come back as exceptions
+    logger.info(f"Processing {len(chunks)} chunks for combined school summary")
+    responses = chain.batch(
+        [{"data_chunk": chunk} for chunk in chunks],
+        config={"max_concurrency": MAX_CONCURRENT_SUMMARY_CHUNKS},
+        return_exceptions=True
+    )
+    
+    # Combine results in chunk order; any failed chunk raises so the summary is not cached
+    all_summaries = []
+    for i, response in enumerate(responses):
+        if isinstance(response, Exception):
+            raise RuntimeError(f"Error processing data chunk {i+1}: {response}") from response
+        # Extract the content
+        all_summaries.append(response.content if hasattr(response, 'content') else str(response))
+    
+    # Combine chunk summaries and add final integration if multiple chunks
+    final_summary = "\n\n".join(all_summaries)
+    
+    # If we had multiple chunks, do a final integration pass
+    if len(chunks) > 1:
+        # Create the integration chain
+        integration_chain = get_prompt(SUMMARY_INTEGRATION_TEMPLATE) | model
         
-        return final_summary
+        # Generate the integrated summary; failures raise so they are not cached
+        integration_response = integration_chain.invoke({"summaries": final_summary})
         
-    except Exception as e:
-        logger.error(f"Error generating combined school summary: {e}")
-        return f"Unable to generate comprehensive summary: {str(e)}"
+        # Replace with integrated version
+        final_summary = integration_response.content if hasattr(integration_response, 'content') else str(integration_response)
+    
+    return final_summary
+
+
+def write_excel_sheets(sheets, output):
+    """Write (sheet name, rows) pairs to an xlsx stream; rows may be any iterable of sequences.
+    
+    Uses xlsxwriter in constant-memory mode when it is installed, otherwise
+    falls back to an openpyxl write-only workbook. Both stream rows straight
+    to XML without building per-cell objects.
+    """
+    if xlsxwriter is not None:
+        # in_memory would override constant_memory, so rows are flushed to temp files instead
+        wb = xlsxwriter.Workbook(output, {"constant_memory": True})
+        for sheet_name, rows in sheets:
+            ws = wb.add_worksheet(sheet_name)
+            for row_index, row in enumerate(rows):
+                ws.write_row(row_index, 0, row)
+        wb.close()
+        return
+    
+    import openpyxl
+    
+    wb = openpyxl.Workbook(write_only=True)
+    for sheet_name, rows in sheets:
+        ws = wb.create_sheet(sheet_name)
+        for row in rows:
+            ws.append(row)
+    wb.save(output)
+
+
+# Columns of the "All Schools Data" sheet, in output order
+EXPORT_COLUMNS = (
+    "School Name",
+    "Website",
+    "Email",
+    "Phone",
+    "Address",
+    "Academic Year",
+    "Tuition Summary",
+    "Programs",
+    "Enrollment Requirements",
+    "Events",
+    "Scholarships",
+    "Facilities",
+    "Faculty",
+    "Achievements",
+    "Marketing",
+    "Technology",
+    "Student Life",
+    "Notes",
+)
+
 
+def join_named_items(items, detail_key):
+    """Join list items as "name (detail)" for dicts and as-is for strings, separated by "; " """
+    return "; ".join([
+        (f"{item.get('name', '')} ({item[detail_key]})" if detail_key in item else item.get("name", ""))
+        if isinstance(item, dict) else item
+        for item in items
+        if isinstance(item, (dict, str))
+    ])
 
-def export_results_to_excel(all_results):
+
+def join_text(value, separator):
+    """Join a list as text with the separator, or return any other value as a string"""
+    if isinstance(value, list):
+        return separator.join(map(str, value))
+    return "" if value is None else str(value)
+
+
+def build_export_row(result):
+    """Build one school's Excel row, with values in EXPORT_COLUMNS order"""
+    # Extract basic school info
+    school_data = {
+        "School Name": result.get("name", ""),
+        "Website": result.get("link", ""),
+    }
+    
+    # Extract contact information
+    contact = result.get("contact")
+    if isinstance(contact, dict):
+        school_data["Email"] = contact.get("email", "")
+        school_data["Phone"] = ", ".join(str(p) for p in contact.get("phone_numbers", [])) if isinstance(contact.get("phone_numbers"), list) else ""
+        school_data["Address"] = contact.get("address", "")
+    
+    # Extract tuition fee information
+    fee_data = result.get("school_fee")
+    if isinstance(fee_data, dict):
+        school_data["Academic Year"] = fee_data.get("academic_year", "")
+        
+        # Combine tuition levels into a single field
+        if "tuition_by_level" in fee_data and isinstance(fee_data["tuition_by_level"], dict):
+            tuition_summary = []
+            for level, details in fee_data["tuition_by_level"].items():
+                if isinstance(details, dict):
+                    fee_text = f"{level}: "
+                    if "annual" in details:
+                        fee_text += f"Annual: {details['annual']} "
+                    tuition_summary.append(fee_text)
+                elif isinstance(details, str):
+                    tuition_summary.append(f"{level}: {details}")
+            
+            school_data["Tuition Summary"] = "; ".join(tuition_summary)
+    
+    # Extract programs
+    programs = result.get("programs")
+    if isinstance(programs, list) and programs:
+        school_data["Programs"] = join_named_items(programs, "grade_level")
+    
+    # Extract enrollment information
+    enrollment = result.get("enrollment")
+    if isinstance(enrollment, dict) and enrollment.get("requirements"):
+        school_data["Enrollment Requirements"] = join_text(enrollment["requirements"], "; ")
+    
+    # Extract events
+    events = result.get("events")
+    if isinstance(events, list) and events:
+        school_data["Events"] = join_named_items(events, "date")
+
+    # Extract scholarships
+    scholarships = result.get("scholarships")
+    if isinstance(scholarships, list) and scholarships:
+        school_data["Scholarships"] = join_named_items(scholarships, "amount")
+    
+    # Extract facilities information
+    facilities = result.get("facilities")
+    if isinstance(facilities, list):
+        facility_summary = []
+        for facility in facilities:
+            if isinstance(facility, dict):
+                facility_summary.append(f"{facility.get('name', '')} ({facility['type']})" if facility.get("type") else facility.get("name", ""))
+            elif isinstance(facility, str):
+                facility_summary.append(facility)
+        
+        school_data["Facilities"] = "; ".join(facility_summary)
+    
+    # Extract faculty information
+    faculty = result.get("faculty")
+    if isinstance(faculty, list):
+        faculty_summary = []
+        for dept in faculty:
+            if isinstance(dept, dict):
+                faculty_summary.append(f"{dept.get('department', '')} ({dept['staff_count']} staff)" if dept.get("staff_count") else dept.get("department", ""))
+            elif isinstance(dept, str):
+                faculty_summary.append(dept)
+        
+        school_data["Faculty"] = "; ".join(faculty_summary)
+    
+    # Extract achievements information
+    achievements = result.get("achievements")
+    if isinstance(achievements, list):
+        achievement_summary = []
+        for achievement in achievements:
+            if isinstance(achievement, dict):
+                achievement_summary.append(f"{achievement.get('name', '')} ({achievement['year']})" if achievement.get("year") else achievement.get("name", ""))
+            elif isinstance(achievement, str):
+                achievement_summary.append(achievement)
+        
+        school_data["Achievements"] = "; ".join(achievement_summary)
+    
+    # Extract marketing content
+    marketing = result.get("marketing_content")
+    if isinstance(marketing, dict):
+        marketing_summary = []
+        
+        # Taglines
+        if "taglines" in marketing and isinstance(marketing["taglines"], list) and marketing["taglines"]:
+            marketing_summary.append("Taglines: " + "; ".join(marketing["taglines"]))
+        
+        # Value propositions
+        if "value_propositions" in marketing and isinstance(marketing["value_propositions"], list) and marketing["value_propositions"]:
+            marketing_summary.append("Value Props: " + "; ".join(marketing["value_propositions"]))
+        
+        school_data["Marketing"] = " | ".join(marketing_summary)
+    
+    # Extract technical data
+    tech_data = result.get("technical_data")
+    if isinstance(tech_data, dict):
+        tech_summary = []
+        
+        if "technology_infrastructure" in tech_data and tech_data["technology_infrastructure"]:
+            tech_summary.append(tech_data["technology_infrastructure"])
+        
+        if "learning_management_system" in tech_data and tech_data["learning_management_system"]:
+            tech_summary.append(f"LMS: {tech_data['learning_management_system']}")
+        
+        school_data["Technology"] = " | ".join(tech_summary)
+    
+    # Extract student life information
+    student_life = result.get("student_life")
+    if isinstance(student_life, dict):
+        student_life_summary = []
+        
+        # Clubs and organizations
+        if "clubs_organizations" in student_life and isinstance(student_life["clubs_organizations"], list) and student_life["clubs_organizations"]:
+            clubs = [club.get("name", "") for club in student_life["clubs_organizations"] if isinstance(club, dict)]
+            if clubs:
+                student_life_summary.append("Clubs: " + "; ".join(clubs))
+        
+        # Campus life overview
+        if "campus_life" in student_life and student_life["campus_life"]:
+            student_life_summary.append(student_life["campus_life"])
+        
+        school_data["Student Life"] = " | ".join(student_life_summary)
+    
+    # Add notes as the last column
+    school_data["Notes"] = result.get("notes", "")
+    
+    return [school_data.get(column) for column in EXPORT_COLUMNS]
+
+
+def export_results_to_excel(all_results, exported_at=None):
     """Export the scraped school results to an Excel file.
     
     This function creates an Excel file with all schools in a single sheet,
@@ -1545,215 +2072,29 @@ def export_results_to_excel(all_results):
     
     Args:
         all_results: List of school data dictionaries
+        exported_at: Time recorded as the Export Date (defaults to now)
         
     Returns:
         BytesIO stream of the Excel file for download
     """
     try:
-        # Create a Pandas Excel writer using openpyxl as the engine
+        # Rows are built one school at a time and streamed straight into the sheet
+        sheets = []
+        if all_results:
+            rows = itertools.chain([EXPORT_COLUMNS], (build_export_row(result) for result in all_results))
+            sheets.append(("All Schools Data", rows))
+        
+        # Create a second sheet with details about what was included
+        metadata = {
+            "Export Date": (exported_at or datetime.now()).isoformat(sep=" ", timespec="seconds"),
+            "Number of Schools": len(all_results),
+            "School Names": ", ".join([result.get("name", "") for result in all_results]),
+            "Export Format": "All schools in one sheet, one row per school"
+        }
+        sheets.append(("Export Info", [list(metadata.keys()), list(metadata.values())]))
+        
         output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            # Create a single comprehensive sheet with all schools
-            all_schools_data = []
-            
-            for result in all_results:
-                # Extract basic school info
-                school_data = {
-                    "School Name": result.get("name", ""),
-                    "Website": result.get("link", ""),
-                }
-                
-                # Extract contact information
-                if isinstance(result.get("contact"), dict):
-                    contact = result.get("contact", {})
-                    school_data["Email"] = contact.get("email", "")
-                    school_data["Phone"] = ", ".join(str(p) for p in contact.get("phone_numbers", [])) if isinstance(contact.get("phone_numbers"), list) else ""
-                    school_data["Address"] = contact.get("address", "")
-                
-                # Extract tuition fee information
-                if isinstance(result.get("school_fee"), dict):
-                    fee_data = result.get("school_fee", {})
-                    school_data["Academic Year"] = fee_data.get("academic_year", "")
-                    
-                    # Combine tuition levels into a single field
-                    if "tuition_by_level" in fee_data and isinstance(fee_data["tuition_by_level"], dict):
-                        tuition_summary = []
-                        for level, details in fee_data["tuition_by_level"].items():
-                            if isinstance(details, dict):
-                                fee_text = f"{level}: "
-                                if "annual" in details:
-                                    fee_text += f"Annual: {details['annual']} "
-                                tuition_summary.append(fee_text)
-                            elif isinstance(details, str):
-                                tuition_summary.append(f"{level}: {details}")
-                        
-                        school_data["Tuition Summary"] = "; ".join(tuition_summary)
-                
-                # Extract programs
-                if isinstance(result.get("programs"), list):
-                    programs = result.get("programs", [])
-                    program_summary = []
-                    for program in programs:
-                        if isinstance(program, dict):
-                            program_text = program.get("name", "")
-                            if "grade_level" in program:
-                                program_text += f" ({program.get('grade_level', '')})"
-                            program_summary.append(program_text)
-                        elif isinstance(program, str):
-                            program_summary.append(program)
-                    
-                    school_data["Programs"] = "; ".join(program_summary)
-                
-                # Extract enrollment information
-                if isinstance(result.get("enrollment"), dict):
-                    enrollment = result.get("enrollment", {})
-                    
-                    # Requirements
-                    if "requirements" in enrollment and enrollment["requirements"]:
-                        if isinstance(enrollment["requirements"], list):
-                            school_data["Enrollment Requirements"] = "; ".join(enrollment["requirements"])
-                        else:
-                            school_data["Enrollment Requirements"] = str(enrollment["requirements"])
-                
-                # Extract events
-                if isinstance(result.get("events"), list):
-                    events = result.get("events", [])
-                    event_summary = []
-                    for event in events:
-                        if isinstance(event, dict):
-                            event_text = event.get("name", "")
-                            if "date" in event:
-                                event_text += f" ({event.get('date', '')})"
-                            event_summary.append(event_text)
-                        elif isinstance(event, str):
-                            event_summary.append(event)
-                    
-                    school_data["Events"] = "; ".join(event_summary)
-                  # Extract scholarships
-                if isinstance(result.get("scholarships"), list):
-                    scholarships = result.get("scholarships", [])
-                    scholarship_summary = []
-                    for scholarship in scholarships:
-                        if isinstance(scholarship, dict):
-                            scholarship_text = scholarship.get("name", "")
-                            if "amount" in scholarship:
-                                scholarship_text += f" ({scholarship.get('amount', '')})"
-                            scholarship_summary.append(scholarship_text)
-                        elif isinstance(scholarship, str):
-                            scholarship_summary.append(scholarship)
-                    
-                    school_data["Scholarships"] = "; ".join(scholarship_summary)
-                
-                # Extract facilities information
-                if isinstance(result.get("facilities"), list):
-                    facilities = result.get("facilities", [])
-                    facility_summary = []
-                    for facility in facilities:
-                        if isinstance(facility, dict):
-                            facility_text = facility.get("name", "")
-                            if "type" in facility and facility["type"]:
-                                facility_text += f" ({facility.get('type', '')})"
-                            facility_summary.append(facility_text)
-                        elif isinstance(facility, str):
-                            facility_summary.append(facility)
-                    
-                    school_data["Facilities"] = "; ".join(facility_summary)
-                
-                # Extract faculty information
-                if isinstance(result.get("faculty"), list):
-                    faculty = result.get("faculty", [])
-                    faculty_summary = []
-                    for dept in faculty:
-                        if isinstance(dept, dict):
-                            dept_text = dept.get("department", "")
-                            if "staff_count" in dept and dept["staff_count"]:
-                                dept_text += f" ({dept.get('staff_count', '')} staff)"
-                            faculty_summary.append(dept_text)
-                        elif isinstance(dept, str):
-                            faculty_summary.append(dept)
-                    
-                    school_data["Faculty"] = "; ".join(faculty_summary)
-                
-                # Extract achievements information
-                if isinstance(result.get("achievements"), list):
-                    achievements = result.get("achievements", [])
-                    achievement_summary = []
-                    for achievement in achievements:
-                        if isinstance(achievement, dict):
-                            achievement_text = achievement.get("name", "")
-                            if "year" in achievement and achievement["year"]:
-                                achievement_text += f" ({achievement.get('year', '')})"
-                            achievement_summary.append(achievement_text)
-                        elif isinstance(achievement, str):
-                            achievement_summary.append(achievement)
-                    
-                    school_data["Achievements"] = "; ".join(achievement_summary)
-                
-                # Extract marketing content
-                if isinstance(result.get("marketing_content"), dict):
-                    marketing = result.get("marketing_content", {})
-                    marketing_summary = []
-                    
-                    # Taglines
-                    if "taglines" in marketing and isinstance(marketing["taglines"], list) and marketing["taglines"]:
-                        marketing_summary.append("Taglines: " + "; ".join(marketing["taglines"]))
-                    
-                    # Value propositions
-                    if "value_propositions" in marketing and isinstance(marketing["value_propositions"], list) and marketing["value_propositions"]:
-                        marketing_summary.append("Value Props: " + "; ".join(marketing["value_propositions"]))
-                    
-                    school_data["Marketing"] = " | ".join(marketing_summary)
-                
-                # Extract technical data
-                if isinstance(result.get("technical_data"), dict):
-                    tech_data = result.get("technical_data", {})
-                    tech_summary = []
-                    
-                    if "technology_infrastructure" in tech_data and tech_data["technology_infrastructure"]:
-                        tech_summary.append(tech_data["technology_infrastructure"])
-                    
-                    if "learning_management_system" in tech_data and tech_data["learning_management_system"]:
-                        tech_summary.append(f"LMS: {tech_data['learning_management_system']}")
-                    
-                    school_data["Technology"] = " | ".join(tech_summary)
-                
-                # Extract student life information
-                if isinstance(result.get("student_life"), dict):
-                    student_life = result.get("student_life", {})
-                    student_life_summary = []
-                    
-                    # Clubs and organizations
-                    if "clubs_organizations" in student_life and isinstance(student_life["clubs_organizations"], list) and student_life["clubs_organizations"]:
-                        clubs = [club.get("name", "") for club in student_life["clubs_organizations"] if isinstance(club, dict)]
-                        if clubs:
-                            student_life_summary.append("Clubs: " + "; ".join(clubs))
-                    
-                    # Campus life overview
-                    if "campus_life" in student_life and student_life["campus_life"]:
-                        student_life_summary.append(student_life["campus_life"])
-                    
-                    school_data["Student Life"] = " | ".join(student_life_summary)
-                
-                # Add notes as the last column
-                school_data["Notes"] = result.get("notes", "")
-                
-                all_schools_data.append(school_data)
-            
-            # Convert to DataFrame and write to Excel
-            if all_schools_data:
-                all_schools_df = pd.DataFrame(all_schools_data)
-                all_schools_df.to_excel(writer, sheet_name="All Schools Data", index=False)
-            
-            # Create a second sheet with details about what was included
-            metadata = {
-                "Export Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "Number of Schools": len(all_results),
-                "School Names": ", ".join([result.get("name", "") for result in all_results]),
-                "Export Format": "All schools in one sheet, one row per school"
-            }
-            
-            metadata_df = pd.DataFrame([metadata])
-            metadata_df.to_excel(writer, sheet_name="Export Info", index=False)
+        write_excel_sheets(sheets, output)
         
         # Seek to the beginning of the stream before reading
         output.seek(0)
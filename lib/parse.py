@@ -5,8 +5,11 @@ from datetime import datetime
 import logging
 import re
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
+from langchain_core.globals import set_llm_cache
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_community.cache import SQLiteCache
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 # Load environment variables
@@ -19,6 +22,15 @@ api_key = os.getenv("GOOGLE_API_KEY")
 if not api_key:
     logger.warning("GOOGLE_API_KEY not found in environment variables. Please set it in your .env file or system environment.")
 
+LLM_CACHE_PATH = ".langchain.db"
+
+
+@lru_cache(maxsize=None)
+def setup_llm_cache():
+    """Persist LLM responses on disk so identical prompts (same model, same settings)
+    are answered from the cache instead of being sent to Gemini again; runs once per process"""
+    set_llm_cache(SQLiteCache(database_path=LLM_CACHE_PATH))
+
 model = ChatGoogleGenerativeAI(model="gemini-2.0-flash-lite", temperature=0)
 
 # Comprehensive analysis prompt for summarizing all schools together
@@ -98,16 +110,21 @@ template = (
     "Here's the content to analyze:\n\n{dom_content}"
 )
 
+MARKDOWN_EMPHASIS_PATTERN = re.compile(r'\*\*|\*|-\*')
+BULLET_PATTERN = re.compile(r'^\s*[-•*]\s*', re.MULTILINE)
+WHITESPACE_PATTERN = re.compile(r'\s+')
+FORMATTING_LINE_PATTERN = re.compile(r'^[=\-_*]+$', re.MULTILINE)
+
 def clean_section_text(text):
     """Clean up the extracted section text to remove formatting artifacts"""
     # Remove markdown-style formatting
-    text = re.sub(r'\*\*|\*|-\*', '', text)
+    text = MARKDOWN_EMPHASIS_PATTERN.sub('', text)
     # Remove bullet points but keep the text
-    text = re.sub(r'^\s*[-•*]\s*', '', text, flags=re.MULTILINE)
+    text = BULLET_PATTERN.sub('', text)
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    text = WHITESPACE_PATTERN.sub(' ', text).strip()
     # Remove any lines that only contain formatting characters
-    text = re.sub(r'^[=\-_*]+$', '', text, flags=re.MULTILINE)
+    text = FORMATTING_LINE_PATTERN.sub('', text)
     return text.strip()
 
 def fix_response_format(response, school_name):
@@ -160,6 +177,7 @@ def create_section_pattern(sections):
 
 def parse_with_langchain(dom_content, parse_description, school_name=""):
     """Parse content using Google Generative AI model through LangChain"""
+    setup_llm_cache()
     
     if not dom_content:
         logger.warning("No content provided for parsing")
@@ -1238,25 +1256,26 @@ def extract_academic_year(text):
         return f"AY {match.group(1)}-{match.group(2)}"
     return "Academic year not found"
 
+SECTION_HEADERS = [
+    'Tuition Fees:', 'Programs Offered:', 'Enrollment Requirements:', 
+    'Enrollment Process:', 'Upcoming Events:', 'Scholarships/Discounts:', 
+    'Facilities:', 'Faculty Information:', 'Faculty and Staff:', 'Achievements:', 
+    'Achievements and Accreditations:', 'Marketing Content:', 'Marketing and Branding:',
+    'Technical Data:', 'Technical Infrastructure:', 'Student Life:',
+    'Contact Information:', 'Notes:'
+]
+# Lookahead that ends a section at the next known header, built once instead of per lookup
+SECTION_END_PATTERN = rf"(?=(?:{'|'.join(re.escape(h) for h in SECTION_HEADERS)})|$)"
+
 def _extract_section(response_text, section_header):
     """Extract a section from the response text using the section header"""
-    headers = [
-        'Tuition Fees:', 'Programs Offered:', 'Enrollment Requirements:', 
-        'Enrollment Process:', 'Upcoming Events:', 'Scholarships/Discounts:', 
-        'Facilities:', 'Faculty Information:', 'Faculty and Staff:', 'Achievements:', 
-        'Achievements and Accreditations:', 'Marketing Content:', 'Marketing and Branding:',
-        'Technical Data:', 'Technical Infrastructure:', 'Student Life:',
-        'Contact Information:', 'Notes:'
-    ]
-    
-    pattern = rf"{re.escape(section_header)}(.*?)(?=(?:{'|'.join([re.escape(h) for h in headers])})|$)"
+    pattern = rf"{re.escape(section_header)}(.*?){SECTION_END_PATTERN}"
     match = re.search(pattern, response_text, re.DOTALL)
     if match:
         section_text = match.group(1).strip()
         return clean_section_text(section_text) if section_text else "No information available"
     
     # If exact match fails, try case-insensitive
-    pattern = rf"{re.escape(section_header)}(.*?)(?=(?:{'|'.join([re.escape(h) for h in headers])})|$)"
     match = re.search(pattern, response_text, re.DOTALL | re.IGNORECASE)
     if match:
         section_text = match.group(1).strip()
@@ -1264,7 +1283,7 @@ def _extract_section(response_text, section_header):
     
     # Try partial match by removing the colon
     section_name = section_header.rstrip(':').lower()
-    pattern = rf"{re.escape(section_name)}[:\s]+(.*?)(?=(?:{'|'.join([re.escape(h) for h in headers])})|$)"
+    pattern = rf"{re.escape(section_name)}[:\s]+(.*?){SECTION_END_PATTERN}"
     match = re.search(pattern, response_text, re.DOTALL | re.IGNORECASE)
     if match:
         section_text = match.group(1).strip()
@@ -1,17 +1,13 @@
 import asyncio
 import os
-import json
 import logging
 import re
 import tempfile
 from pathlib import Path
 from urllib.parse import urlparse
 
-from langchain_community.document_loaders import PyPDFLoader
-
 from lib.school_data import SchoolData
-from lib.parse import parse_with_langchain
-from lib.utils import extract_body_content, clean_body_content, extract_urls
+from lib.utils import extract_body_content, clean_body_content, extract_urls, school_slug, json_dumps
 from lib.models import SchoolInfo
 from services.session_manager import SessionManager
 
@@ -23,6 +19,10 @@ OUTPUT_DIR = Path("output")
 RAW_DATA_DIR = OUTPUT_DIR / "raw_data"
 PARSED_DATA_DIR = OUTPUT_DIR / "parsed_data"
 
+# Links of one school fetched at a time; a reasonable limit to avoid overwhelming the server.
+# Adjust this value based on server capacity and rate limiting considerations
+LINK_BATCH_SIZE = 5
+
 for directory in [OUTPUT_DIR, RAW_DATA_DIR, PARSED_DATA_DIR]:
     directory.mkdir(exist_ok=True)
 
@@ -33,6 +33,8 @@ class SchoolScraper:
         self.school_links = SchoolData.get_school_links()
         # Convert links to school data format for compatibility with existing code
         self.schools_data = self._initialize_school_data_from_links()
+        # Index the schools by name once, for direct lookups
+        self.schools_by_name = {school["name"]: school for school in self.schools_data}
         
     def _initialize_school_data_from_links(self):
         """
@@ -125,6 +127,9 @@ class SchoolScraper:
                         logger.info(f"PDF downloaded to temporary file: {temp_pdf_path}")
                         
                         try:
+                            # Imported here so langchain_community only loads once a PDF is found
+                            from langchain_community.document_loaders import PyPDFLoader
+                            
                             # Use PyPDFLoader to extract text from the PDF
                             loader = PyPDFLoader(temp_pdf_path)
                             pages = loader.load_and_split()
@@ -244,14 +249,14 @@ class SchoolScraper:
         school_link = school_data.get("link", "")
         
         # Prepare a raw content file for this school
-        raw_file_path = RAW_DATA_DIR / f"{school_name.replace(' ', '_')}_raw.txt"
+        raw_file_path = RAW_DATA_DIR / f"{school_slug(school_name)}_raw.txt"
         
         # Use the URL extractor API to get relevant links
         if status_text:
             status_text.text(f"Extracting URLs from {school_name} website...")
             
         logger.info(f"Extracting URLs from {school_link} using API")
-        all_urls = await extract_urls(school_link)
+        all_urls = await extract_urls(school_link, self.session_manager)
         
         # Organize extracted URLs by category
         extracted_links = self._categorize_urls(all_urls, school_link, school_name)
@@ -367,20 +372,16 @@ class SchoolScraper:
                 
             logger.info(f"Processing {len(all_links)} links for {school_name} in parallel")
             
-            # Set a reasonable concurrency limit to avoid overwhelming the server
-            # Adjust this value based on server capacity and rate limiting considerations
-            concurrency_limit = 5
-            
             # Process links in batches to control concurrency
             results = []
-            for i in range(0, len(all_links), concurrency_limit):
-                batch = all_links[i:i + concurrency_limit]
+            for i in range(0, len(all_links), LINK_BATCH_SIZE):
+                batch = all_links[i:i + LINK_BATCH_SIZE]
                 batch_tasks = [self._process_single_link(link_info, method, f, status_text) for link_info in batch]
                 batch_results = await asyncio.gather(*batch_tasks)
                 results.extend(batch_results)
                 
                 # Add a small delay between batches
-                if i + concurrency_limit < len(all_links):
+                if i + LINK_BATCH_SIZE < len(all_links):
                     await asyncio.sleep(2)
             
             # Write all results to the file
@@ -418,6 +419,14 @@ class SchoolScraper:
             "raw_file_path": str(raw_file_path)
         }
     
+    def _write_parsed_file(self, school_name, parsed_result):
+        """Save parsed data to a JSON file, replacing any previous file in one step
+        (this also updates the directory mtime the app uses to detect changes)"""
+        parsed_file_path = PARSED_DATA_DIR / f"{school_slug(school_name)}_parsed.json"
+        temp_file_path = parsed_file_path.with_name(parsed_file_path.name + ".tmp")
+        temp_file_path.write_bytes(json_dumps(parsed_result))
+        os.replace(temp_file_path, parsed_file_path)
+    
     async def parse_school_data(self, raw_data_info, status_text=None):
         """Parse the raw school data using the AI model and structure it according to our model"""
         school_name = raw_data_info["school_name"]
@@ -450,15 +459,20 @@ class SchoolScraper:
                 "Pay special attention to unique features, differentiators, or specialized offerings that make this school stand out."
             )
             
-            # Parse the content with structured output format
-            parsed_result = parse_with_langchain(
+            # Imported here so the Gemini client and LLM cache load on the first parse, not at app start
+            from lib.parse import parse_with_langchain
+            
+            # Parse the content with structured output format in a worker thread,
+            # so other schools keep scraping while the model call blocks
+            parsed_result = await asyncio.to_thread(
+                parse_with_langchain,
                 raw_content, 
                 parse_description, 
                 school_name=school_name
             )
             
             # Get the school's link from our school data
-            school_link = next((school for school in self.schools_data if school.get("name") == school_name), {}).get("link", "")
+            school_link = self.schools_by_name.get(school_name, {}).get("link", "")
             
             # If parsed_result is a dict, it's already in the new format
             if isinstance(parsed_result, dict):
@@ -472,10 +486,8 @@ class SchoolScraper:
                 )
                 parsed_result = school_info.to_dict()
             
-            # Save parsed data to a JSON file
-            parsed_file_path = PARSED_DATA_DIR / f"{school_name.replace(' ', '_')}_parsed.json"
-            with open(parsed_file_path, "w", encoding="utf-8") as f:
-                json.dump(parsed_result, f, indent=2)
+            # Save parsed data in a worker thread, so the event loop keeps serving other schools
+            await asyncio.to_thread(self._write_parsed_file, school_name, parsed_result)
             
             logger.info(f"Completed parsing data for {school_name}")
             if status_text:
@@ -492,7 +504,7 @@ class SchoolScraper:
             # Create a failsafe response with error information
             error_info = SchoolInfo(
                 name=school_name,
-                link=next((school for school in self.schools_data if school.get("name") == school_name), {}).get("link", "")
+                link=self.schools_by_name.get(school_name, {}).get("link", "")
             )
             error_info.notes = f"Error during parsing: {str(e)}"
             
@@ -2,13 +2,41 @@ from bs4 import BeautifulSoup
 import asyncio
 import json
 import logging
+import re
+from functools import lru_cache
 from services.session_manager import SessionManager
 
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the stdlib json module
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
 # Chonkie is imported within the split_dom_content function to avoid import errors if not installed yet
 
+
+@lru_cache(maxsize=256)
+def school_slug(school_name):
+    """Return the file-name form of a school name, as used for the raw and parsed data files"""
+    return school_name.replace(" ", "_")
+
+
+def json_loads(data):
+    """Decode JSON from bytes or str, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """Encode an object as indented UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
 def extract_body_content(html_content):
     soup = BeautifulSoup(html_content, "html.parser")
     body_content = soup.body
@@ -42,6 +70,44 @@ def clean_body_content(body_content):
     return cleaned_content
 
 
+# Separator lines written between pages of a raw data file, e.g. "=====PAGE=====" or "====="
+RAW_SEPARATOR_PATTERN = re.compile(r"^=+(?:PAGE=+)?$")
+WHITESPACE_RUN_PATTERN = re.compile(r"[ \t]+")
+
+
+def compact_raw_text(raw_text):
+    """
+    Shrink raw scraped text before it is sent to the LLM.
+    
+    Drops page separator lines and boilerplate repeated across pages (menus,
+    headers, footers that survived cleaning), keeping its first page's copy, and
+    collapses runs of spaces, so a fixed character budget carries more of the
+    actual page content. Lines repeated within one page, such as the same fee for
+    several grade levels, are kept.
+    """
+    # Split into pages on the separator lines, normalizing whitespace as we go
+    pages = [[]]
+    for line in raw_text.splitlines():
+        line = WHITESPACE_RUN_PATTERN.sub(" ", line).strip()
+        if RAW_SEPARATOR_PATTERN.match(line):
+            pages.append([])
+        elif line:
+            pages[-1].append(line)
+    
+    # The first page each line appears on; lines seen again on a later page are boilerplate
+    first_page = {}
+    for page_number, page in enumerate(pages):
+        for line in page:
+            first_page.setdefault(line, page_number)
+    
+    return "\n".join(
+        line
+        for page_number, page in enumerate(pages)
+        for line in page
+        if first_page[line] == page_number
+    )
+
+
 def split_dom_content(dom_content, max_length=8000):
     """
     Split content using Chonkie's SentenceChunker to maintain sentence context
@@ -71,17 +137,19 @@ def split_dom_content(dom_content, max_length=8000):
     return chunks
 
 
-async def extract_urls(url):
+async def extract_urls(url, session_manager=None):
     """
     Extracts URLs from the given URL using the SessionManager.
     
     Args:
         url (str): The URL to extract links from.
+        session_manager (SessionManager, optional): Session manager to reuse.
+            A new one is created when not provided.
         
     Returns:
         list: A list of extracted URLs.
     """
-    session_manager = SessionManager()
+    session_manager = session_manager or SessionManager()
     payload = json.dumps({"url": url})
 
     response = await session_manager.post("https://yourgpt.ai/api/extractUrls", data=payload)
@@ -1,7 +1,12 @@
 import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from typing import Dict, List, Any, Optional, Union
 from curl_cffi import AsyncSession
 
+# Session opened by SessionManager.session() for the current task and the tasks it spawns
+_active_session: ContextVar[Optional[AsyncSession]] = ContextVar("active_session", default=None)
+
 class SessionManager:
     """
     Session manager for making asynchronous HTTP requests using curl_cffi.
@@ -20,6 +25,36 @@ class SessionManager:
             'Accept-Language': 'en-US,en;q=0.5',
         }
         
+    @asynccontextmanager
+    async def session(self, max_clients: int = 10):
+        """
+        Share one session between all requests made inside this block.
+        
+        The session is tracked in a context variable, so it is seen by tasks started
+        inside the block but not by other callers on other threads or event loops,
+        and it is closed on the loop that opened it when the block exits.
+        
+        Args:
+            max_clients: Maximum number of requests the session runs at once.
+        """
+        async with AsyncSession(impersonate="chrome131", max_clients=max_clients) as session:
+            token = _active_session.set(session)
+            try:
+                yield session
+            finally:
+                _active_session.reset(token)
+    
+    async def _request(self, method: str, url: str, **kwargs) -> Any:
+        """
+        Make a request with the session of the enclosing session() block, or with a
+        one-off session when there is none.
+        """
+        session = _active_session.get()
+        if session is not None:
+            return await getattr(session, method)(url, **kwargs)
+        async with AsyncSession(impersonate="chrome131") as session:
+            return await getattr(session, method)(url, **kwargs)
+        
     async def make_requests(self, 
                            requests: List[Dict[str, Any]]) -> List[Any]:
         """
@@ -75,31 +110,30 @@ class SessionManager:
             Response object with html content
         """
         try:
-            async with AsyncSession(impersonate="chrome131", timeout=120) as session:
-                combined_headers = {**self.default_headers}
-                
-                if headers:
-                    combined_headers.update(headers)
-                
-                response = await session.get(url, headers=combined_headers)
-                
-                # Create a custom response object that has both text property and text() method
-                # for compatibility with different access patterns
-                class CustomResponse:
-                    def __init__(self, original_response):
-                        self.original = original_response
-                        self.status_code = original_response.status_code
-                        self._text = original_response.text
-                    
-                    def text(self):
-                        return self._text
-                    
-                    @property
-                    def text(self):
-                        return self._text
+            combined_headers = {**self.default_headers}
+            
+            if headers:
+                combined_headers.update(headers)
+            
+            response = await self._request("get", url, headers=combined_headers, timeout=120)
+            
+            # Create a custom response object that has both text property and text() method
+            # for compatibility with different access patterns
+            class CustomResponse:
+                def __init__(self, original_response):
+                    self.original = original_response
+                    self.status_code = original_response.status_code
+                    self._text = original_response.text
                 
-                return CustomResponse(response)
+                def text(self):
+                    return self._text
                 
+                @property
+                def text(self):
+                    return self._text
+            
+            return CustomResponse(response)
+            
         except Exception as e:
             # Create a more informative empty response
             class EmptyResponse:
@@ -134,35 +168,34 @@ class SessionManager:
             Response object
         """
         try:
-            async with AsyncSession(impersonate="chrome131") as session:
-                combined_headers = {**self.default_headers}
-                if headers:
-                    combined_headers.update(headers)
-                
-                kwargs = {'headers': combined_headers}
-                if data is not None:
-                    kwargs['data'] = data
-                if json is not None:
-                    kwargs['json'] = json
-                
-                response = await session.post(url, **kwargs)
-                
-                # Create a custom response object that has both text property and text() method
-                class CustomResponse:
-                    def __init__(self, original_response):
-                        self.original = original_response
-                        self.status_code = original_response.status_code
-                        self._text = original_response.text
-                    
-                    def text(self):
-                        return self._text
-                    
-                    @property
-                    def text(self):
-                        return self._text
+            combined_headers = {**self.default_headers}
+            if headers:
+                combined_headers.update(headers)
+            
+            kwargs = {'headers': combined_headers}
+            if data is not None:
+                kwargs['data'] = data
+            if json is not None:
+                kwargs['json'] = json
+            
+            response = await self._request("post", url, **kwargs)
+            
+            # Create a custom response object that has both text property and text() method
+            class CustomResponse:
+                def __init__(self, original_response):
+                    self.original = original_response
+                    self.status_code = original_response.status_code
+                    self._text = original_response.text
                 
-                return CustomResponse(response)
+                def text(self):
+                    return self._text
                 
+                @property
+                def text(self):
+                    return self._text
+            
+            return CustomResponse(response)
+            
         except Exception as e:
             # Create a more informative empty response
             class EmptyResponse: